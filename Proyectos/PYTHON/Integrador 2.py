@@ -1,36 +1,41 @@
 import time
-import sqlite3
 import os
+import reproduccion
+from comercio_db import ComercioDB
+from precios import PRECIOS, calcular
+
+# de dónde salen las respuestas del menú: el teclado o un guion (ver reproduccion.py)
+entrada = input
 
 def ingreso_str(mensaje,error):
-    dato = input(mensaje)
+    dato = entrada(mensaje)
     while dato=="":
         print(error)
-        dato = input(mensaje)
+        dato = entrada(mensaje)
     return dato
 
 
 def ingreso_int(mensaje,error):
-    dato = input(mensaje)
+    dato = entrada(mensaje)
     while True:
         try:
             dato = int(dato)
             break
         except ValueError:
             print(error)
-        dato = input(mensaje)
+        dato = entrada(mensaje)
     return dato
 
 
 def ingreso_float(mensaje,error):
-    dato = input(mensaje)
+    dato = entrada(mensaje)
     while True:
         try:
             dato = float(dato)
             break
         except ValueError:
             print(error)
-        dato = input(mensaje)
+        dato = entrada(mensaje)
     return dato
 
 
@@ -46,15 +51,6 @@ def ingresar():
     return nombre
 
 
-def calcular(precios,pedido):
-    total = 0
-    total += pedido["ComboSimple"] * precios["ComboSimple"]
-    total += pedido["ComboDoble"] * precios["ComboDoble"]  
-    total += pedido["ComboTriple"] * precios["ComboTriple"]
-    total += pedido["Flurby"] * precios["Flurby"]
-    return total
-
-
 def confirmar():
     respuesta = ingreso_str("¿Confirma el pedido? Y/N: ","Error. Campo vacio.")
     while respuesta.lower() != "y" and respuesta.lower() != "n" and respuesta.lower() != "yes" and respuesta.lower() != "no":
@@ -68,54 +64,16 @@ def confirmar():
 
 
 
-def guardarVentas(data):
+def guardarVentas(data, turno):
     datos = tuple(data.values())
-    conn = sqlite3.connect("comercio.sqlite")
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO ventas VALUES (null,?,?,?,?,?,?,?)", datos)
-    except sqlite3.OperationalError:
-        cursor.execute("""CREATE TABLE ventas 
-        ( 
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            cliente TEXT,
-            fecha TEXT,
-            ComboS INT,
-            ComboD INT,
-            ComboT INT,
-            Flurby INT,
-            total REAL
-        )
-        """)
-        cursor.execute("INSERT INTO ventas VALUES (null,?,?,?,?,?,?,?)", datos)
-    conn.commit()
-    conn.close
+    db.guardarVenta(datos, turno)
     print("¡Se salvo el nuevo contacto!")
 
 
 
 def guardarEncargado(data):
-    datosIn = (data["nombre"],data["ingreso"],"IN",0)
-    datosOut = (data["nombre"],data["egreso"],"OUT",data["facturado"])
-    conn = sqlite3.connect("comercio.sqlite")
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO registro VALUES (null,?,?,?,?)", datosIn)
-        cursor.execute("INSERT INTO registro VALUES (null,?,?,?,?)", datosOut)
-    except sqlite3.OperationalError:
-        cursor.execute("""CREATE TABLE registro 
-        ( 
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            encargado TEXT,
-            fecha TEXT,
-            evento TEXT,
-            caja REAL
-        )
-        """)
-        cursor.execute("INSERT INTO registro VALUES (null,?,?,?,?)", datosIn)
-        cursor.execute("INSERT INTO registro VALUES (null,?,?,?,?)", datosOut)
-    conn.commit()
-    conn.close
+    # la caja del turno la lleva la base, así sobrevive a un corte
+    data["facturado"] = db.cerrarTurno(data["turno"], data["egreso"])
     print("¡Se salvo el nuevo contacto!")
 
 
@@ -127,64 +85,87 @@ if(os.name=="nt"):
     borrar = "cls"
 else:
     borrar = "clear"
+limpiarPantalla = True
 
-precios = {"ComboSimple":5,"ComboDoble":6,"ComboTriple":7,"Flurby":2}
-salir = True
-
-os.system(borrar)
-while salir:
-    os.system(borrar)
-    datosEncargado = {"nombre":"","ingreso":"","egreso":"","facturado":0}
-    encargado = ingresar()
-    inicio = time.asctime()
-    datosEncargado["nombre"] = encargado
-    datosEncargado["ingreso"] = inicio
-    caja = 0
-    os.system(borrar)
-    while True:
-        saludar(encargado)
-        print("""
-        1 – Ingreso de nuevo pedido
-        2 – Cambio de turno
-        3 – Apagar sistema
-        """)
-        opcion = ingreso_str(">>>","Error, ingreso vacio")
+
+def limpiar():
+    if limpiarPantalla:
         os.system(borrar)
-        if opcion == "1":
-            pedido = {"cliente":"","fecha":"","ComboSimple":0,"ComboDoble":0,"ComboTriple":0,"Flurby":0,"total":0}
-            pedido["cliente"] = ingreso_str("Ingrese el nombre del cliente: ","Error. No deje este campo vacio")
-            pedido["ComboSimple"] = ingreso_int("Ingrese cantidad Combo S: ","Error, solo números")
-            pedido["ComboDoble"] = ingreso_int("Ingrese cantidad Combo D: ","Error, solo números")
-            pedido["ComboTriple"] = ingreso_int("Ingrese cantidad Combo T: ","Error, solo números")
-            pedido["Flurby"] = ingreso_int("Ingrese cantidad Flurby: ","Error, solo números")
-            costoTotal = calcular(precios,pedido)
-            print("Total $", costoTotal)
-            recibido = ingreso_float("Abona con $ ","Error, solo números")
-            while costoTotal > recibido:
-                print("Ingrese un monto mayor, no alcanza.")
+
+
+def main(fuente=input, pantalla=True):
+    """Menú de la caja. Devuelve la cantidad de pedidos guardados."""
+    global entrada, limpiarPantalla, db
+    entrada = fuente
+    limpiarPantalla = pantalla
+    db = ComercioDB()
+    pedidos = 0
+    salir = True
+
+    limpiar()
+    while salir:
+        limpiar()
+        datosEncargado = {"nombre":"","ingreso":"","egreso":"","facturado":0,"turno":None}
+        encargado = ingresar()
+        inicio = time.time()
+        datosEncargado["nombre"] = encargado
+        datosEncargado["ingreso"] = inicio
+        datosEncargado["turno"] = db.abrirTurno(encargado, inicio)
+        limpiar()
+        while True:
+            saludar(encargado)
+            print("Caja del turno $", db.cajaTurno(datosEncargado["turno"]))
+            print("""
+            1 – Ingreso de nuevo pedido
+            2 – Cambio de turno
+            3 – Apagar sistema
+            """)
+            opcion = ingreso_str(">>>","Error, ingreso vacio")
+            limpiar()
+            if opcion == "1":
+                pedido = {"cliente":"","fecha":"","ComboSimple":0,"ComboDoble":0,"ComboTriple":0,"Flurby":0,"total":0}
+                pedido["cliente"] = ingreso_str("Ingrese el nombre del cliente: ","Error. No deje este campo vacio")
+                pedido["ComboSimple"] = ingreso_int("Ingrese cantidad Combo S: ","Error, solo números")
+                pedido["ComboDoble"] = ingreso_int("Ingrese cantidad Combo D: ","Error, solo números")
+                pedido["ComboTriple"] = ingreso_int("Ingrese cantidad Combo T: ","Error, solo números")
+                pedido["Flurby"] = ingreso_int("Ingrese cantidad Flurby: ","Error, solo números")
+                costoTotal = calcular(PRECIOS,pedido)
+                print("Total $", costoTotal)
                 recibido = ingreso_float("Abona con $ ","Error, solo números")
-            print("Vuelto $",recibido-costoTotal)
-            estado = confirmar()
-            if estado:
-                caja += costoTotal
-                pedido["fecha"] = time.asctime()
-                pedido["total"] = costoTotal
-                guardarVentas(pedido)
+                while costoTotal > recibido:
+                    print("Ingrese un monto mayor, no alcanza.")
+                    recibido = ingreso_float("Abona con $ ","Error, solo números")
+                print("Vuelto $",recibido-costoTotal)
+                estado = confirmar()
+                if estado:
+                    pedido["fecha"] = time.time()
+                    pedido["total"] = costoTotal
+                    guardarVentas(pedido, datosEncargado["turno"])
+                    pedidos += 1
+                else:
+                    print("Pedido cancelado")
+            elif opcion == "2":
+                datosEncargado["egreso"] = time.time()
+                guardarEncargado(datosEncargado)
+                break
+            elif opcion == "3":
+                datosEncargado["egreso"] = time.time()
+                guardarEncargado(datosEncargado)
+                print("¡Muchas gracias por usar nuestro programa!")
+                db.close()
+                salir = False
+                break
             else:
-                print("Pedido cancelado")
-        elif opcion == "2":
-            datosEncargado["egreso"] = time.asctime()
-            datosEncargado["facturado"] = caja
-            guardarEncargado(datosEncargado)
-            break
-        elif opcion == "3":
-            datosEncargado["egreso"] = time.asctime()
-            datosEncargado["facturado"] = caja
-            guardarEncargado(datosEncargado)
-            print("¡Muchas gracias por usar nuestro programa!")
-            salir = False
-            break
-        else:
-            print("Opcion incorrecta, vuelva a intentarlo")
-            print("\n*3")
-        os.system(borrar)
\ No newline at end of file
+                print("Opcion incorrecta, vuelva a intentarlo")
+                print("\n*3")
+            limpiar()
+    return pedidos
+
+
+if __name__ == "__main__":
+    args = reproduccion.argumentos("Caja de Hamburguesas IT")
+    if args.guion or args.sinteticos:
+        # sin borrar la pantalla: cada os.system lanza un proceso
+        reproduccion.reproducir(lambda guion: main(guion, pantalla=False), args)
+    else:
+        main()
@@ -1,69 +1,71 @@
 import tkinter as tk
 from tkinter import messagebox
 import time
-import sqlite3
-import requests
 import sys
+import atexit
+from concurrent.futures import ThreadPoolExecutor
+from comercio_db import ComercioDB, EscritorVentas
+from cotizacion import CacheCotizacion
+from precios import PRECIOS, calcular
  
 ##########################
 
 
 def guardarEncargado(data):
-    datosIn = (data["nombre"],data["ingreso"],"IN",0)
-    datosOut = (data["nombre"],data["egreso"],"OUT",data["facturado"])
-    conn = sqlite3.connect("comercio.sqlite")
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO registro VALUES (null,?,?,?,?)", datosIn)
-        cursor.execute("INSERT INTO registro VALUES (null,?,?,?,?)", datosOut)
-    except sqlite3.OperationalError:
-        cursor.execute("""CREATE TABLE registro 
-        ( 
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            encargado TEXT,
-            fecha TEXT,
-            evento TEXT,
-            caja REAL
-        )
-        """)
-        cursor.execute("INSERT INTO registro VALUES (null,?,?,?,?)", datosIn)
-        cursor.execute("INSERT INTO registro VALUES (null,?,?,?,?)", datosOut)
-    conn.commit()
-    conn.close
-
- 
-def guardarVentas(data):
-    datos = tuple(data)
-    conn = sqlite3.connect("comercio.sqlite")
-    cursor = conn.cursor()
-    try:
-        cursor.execute("INSERT INTO ventas VALUES (null,?,?,?,?,?,?,?)", datos)
-    except sqlite3.OperationalError:
-        cursor.execute("""CREATE TABLE ventas 
-        ( 
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            cliente TEXT,
-            fecha TEXT,
-            ComboS INT,
-            ComboD INT,
-            ComboT INT,
-            Flurby INT,
-            total REAL
-        )
-        """)
-        cursor.execute("INSERT INTO ventas VALUES (null,?,?,?,?,?,?,?)", datos)
-    conn.commit()
-    conn.close
+    # primero se graban las ventas pendientes, así la caja del turno queda completa
+    escritor.vaciar()
+    data["facturado"] = db.cerrarTurno(data["turno"], data["egreso"])
+
+ 
+def guardarVentas(data, turno):
+    escritor.encolar(data, turno)
+
+
+def en_segundo_plano(funcion, *args, listo=None, fallo=None):
+    # la tarea corre en el hilo de trabajo y el resultado vuelve a la ventana con after(),
+    # así la ventana nunca espera al disco ni a la base
+    futuro = trabajos.submit(funcion, *args)
+    def revisar():
+        if not futuro.done():
+            ventana.after(15, revisar)
+        elif futuro.exception() is not None:
+            if fallo:
+                fallo(futuro.exception())
+            else:
+                messagebox.showerror(title="Error", message=str(futuro.exception()))
+        elif listo:
+            listo(futuro.result())
+    ventana.after(15, revisar)
+    return futuro
+
+
+def pendiente(activo, texto):
+    # mientras se graba un pedido no se puede hacer otro, pero la ventana sigue respondiendo
+    bpedido.config(state=tk.DISABLED if activo else tk.NORMAL)
+    binfo.config(state=tk.DISABLED if activo else tk.NORMAL)
+    eestado.config(text=texto)
+
+
+def caja_turno():
+    # la caja de esta terminal: el turno de su encargado, no la suma de todas las cajas abiertas
+    turno = datosEncargado["turno"]
+    return db.cajaTurno(turno) if turno is not None else 0
+
+
+def mostrar_cola():
+    estado = escritor.estadisticas()
+    texto = "Cola: " + str(estado["pendientes"]) + " | Último lote: " + str(round(estado["latencia_ms"], 1)) + " ms | Caja $" + str(round(consultaCaja["caja"], 2))
+    if estado["error"]:
+        # los pedidos en cola no se perdieron: el escritor los vuelve a intentar solo, cada vez más espaciado
+        texto = "Sin grabar: " + str(estado["pendientes"]) + " | Error: " + estado["error"] + " (se reintenta)"
+    ecola.config(text=texto, fg="red" if estado["error"] else "black")
+    if consultaCaja["futuro"] is None or consultaCaja["futuro"].done():
+        consultaCaja["futuro"] = en_segundo_plano(caja_turno, listo=lambda caja: consultaCaja.update(caja=caja), fallo=lambda error: None)
+    ventana.after(500, mostrar_cola)
 
 def cotizar():
-    try:
-        r = requests.get("https://api-dolar-argentina.herokuapp.com/api/dolaroficial")
-        valor = r.json()["venta"]
-        valor = round(float(valor))
-        return valor
-    except:
-        messagebox.showerror(title="Error grave", message="Sin internet para cotizar. Terminado")
-        sys.exit()
+    # el valor sale de la memoria; si venció se refresca en segundo plano
+    return cache_dolar.valor()
 
 
 def validar(dato):
@@ -90,6 +92,22 @@ def cancelar_pedido():
 
 
  
+def registrar_pedido(pedido, encargado):
+    # corre en el hilo de trabajo: cambio de turno y guardado, fuera del hilo de la ventana
+    fecha = pedido[1]
+    if datosEncargado["turno"] is not None and datosEncargado["nombre"] != encargado:
+        datosEncargado["egreso"] = fecha # al cambiar de encargado registro la fecha
+        guardarEncargado(datosEncargado) # guardo
+        datosEncargado["ingreso"] = fecha
+        datosEncargado["turno"] = None
+    if datosEncargado["turno"] is None:
+        # iniciamos el turno del nuevo encargado (o retomamos el que quedó abierto)
+        datosEncargado["nombre"] = encargado
+        datosEncargado["turno"] = db.abrirTurno(encargado, datosEncargado["ingreso"])
+    guardarVentas(pedido, datosEncargado["turno"])
+    return datosEncargado["turno"]
+
+
 def pedir():
     cantUno= ccomboUno.get()
     cantUno = validar(cantUno)
@@ -99,35 +117,27 @@ def pedir():
     cantTres = validar(cantTres)
     cantPostre = cpostre.get()
     cantPostre = validar(cantPostre) 
-    dolar = cotizar() 
     if cantUno>=0 and cantDos>=0 and cantTres>=0 and cantPostre>=0:
         cliente = ccliente.get()
         encargado = cencargado.get()
-        if cliente and encargado:
+        dolar = cotizar()
+        if dolar is None:
+            messagebox.showwarning(title="Advertencia", message="Todavía no hay cotización del dólar, intente en unos segundos")
+        elif cliente and encargado:
             respuesta = messagebox.askyesno(title="Pregunta", message="¿Confirma el pedido?")
             if respuesta:
-                costot = ((cantUno*precios["ComboSimple"])+(cantDos*precios["ComboDoble"])+(cantTres*precios["ComboTriple"])+(cantPostre*precios["Flurby"]))
+                costot = calcular(PRECIOS,{"ComboSimple":cantUno,"ComboDoble":cantDos,"ComboTriple":cantTres,"Flurby":cantPostre})
                 totalPesos = costot * dolar
-                fecha = time.asctime()
+                fecha = time.time()
                 pedido = [cliente,fecha,cantUno,cantDos,cantTres,cantPostre,totalPesos]
-                messagebox.showinfo(title="A pagar", message="$"+str(totalPesos))
-                guardarVentas(pedido)
-                messagebox.showinfo(title="Información", message="Pedido Exitoso")
-                if  datosEncargado["nombre"] != encargado and datosEncargado["egreso"] == "" : # cuando inicia la app egreso es vacio
-                    datosEncargado["nombre"] = encargado
-                    datosEncargado["egreso"] = "SinFecha" # es solo para que la proxima no cumpla la condición, es solo al inicio
-                    datosEncargado["facturado"] += totalPesos #voy incrementando totales
-                elif datosEncargado["nombre"] == encargado:
-                    datosEncargado["facturado"] += totalPesos #voy incrementando totales
-                else:
-                    datosEncargado["egreso"] = fecha # al cambiar de encargado registro la fecha
-                    guardarEncargado(datosEncargado) # guardo
-                    #borramos el encargado anterior, en el diccionario ponemos el nuevo
-                    datosEncargado["nombre"] = encargado # iniciamos el nuevo encargado
-                    datosEncargado["Ingreso"] = fecha
-                    datosEncargado["facturado"] = 0
-                    datosEncargado["facturado"] += totalPesos
-                borrar()
+                pendiente(True, "A pagar $" + str(totalPesos) + " | Guardando...")
+                def encolado(turno):
+                    # el formulario se limpia recién ahora: si algo falla, el pedido sigue ahí para reintentarlo.
+                    # Desde la cola lo graba el escritor; si no puede, lo reintenta y avisa en ecola
+                    borrar()
+                    pendiente(False, "A pagar $" + str(totalPesos) + " | Pedido en cola de grabación")
+                en_segundo_plano(registrar_pedido, pedido, encargado, listo=encolado,
+                                 fallo=lambda error: pendiente(False, "Error al guardar el pedido: " + str(error)))
             else:
                 messagebox.showinfo(title="Información", message="Pedido en pausa")
         else:
@@ -140,16 +150,32 @@ def salir():
     #salir seguro implica guardar el último encargado
     respuesta = messagebox.askyesno(title="Pregunta", message="¿Desea salir?")
     if respuesta:
-        datosEncargado["egreso"] = time.asctime()
+        pendiente(True, "Cerrando turno...")
+        en_segundo_plano(cerrar_todo, listo=lambda resultado: sys.exit(),
+                         fallo=lambda error: pendiente(False, "Error al cerrar: " + str(error)))
+
+
+def cerrar_todo():
+    # corre en el hilo de trabajo, igual que todo lo que toca la base
+    if datosEncargado["turno"] is not None:
+        datosEncargado["egreso"] = time.time()
         guardarEncargado(datosEncargado)
-        sys.exit()
+    escritor.cerrar()
+    db.close()
     
 
  
 ##########################
 
-precios = {"ComboSimple":5,"ComboDoble":6,"ComboTriple":7,"Flurby":2}
-datosEncargado = {"nombre":"","ingreso":time.asctime(),"egreso":"","facturado":0}
+datosEncargado = {"nombre":"","ingreso":time.time(),"egreso":"","facturado":0,"turno":None}
+consultaCaja = {"caja":0,"futuro":None}
+# un solo hilo de trabajo: es el dueño de la conexión y mantiene el orden de los turnos
+trabajos = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pedidos")
+db = trabajos.submit(ComercioDB).result()
+escritor = EscritorVentas()
+# salga como salga el programa, lo que quedó en la cola se graba antes de terminar
+atexit.register(escritor.cerrar)
+cache_dolar = CacheCotizacion(ttl=600)
  
 ##########################
  
@@ -173,6 +199,10 @@ ecliente = tk.Label(text = "Postre cantidad : ")
 ecliente.place(x = 50, y = 230)
 epostre = tk.Label(text = "Nombre del cliente : ")
 epostre.place(x = 50, y = 270)
+eestado = tk.Label(text = "")
+eestado.place(x = 50, y = 300)
+ecola = tk.Label(text = "")
+ecola.place(x = 30, y = 375)
  
 #####cajas#########
 
@@ -201,4 +231,7 @@ binfo = tk.Button(text = "Salir seguro",command=salir)
 binfo.place(x = 30 , y = 330, height=40, width = 100)
  
  
+# cerrar con la X es lo mismo que la salida segura: se cierra el turno y se vacía la cola
+ventana.protocol("WM_DELETE_WINDOW", salir)
+mostrar_cola()
 ventana.mainloop()
\ No newline at end of file
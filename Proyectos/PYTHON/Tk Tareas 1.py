@@ -1,7 +1,9 @@
 import tkinter as tk
 from tkinter import messagebox
 from datetime import datetime
+from bisect import bisect_left
 import sqlite3
+import tareas_cambios
 
 # --- Base de datos ---
 conn = sqlite3.connect("tareas.db")
@@ -13,48 +15,115 @@ CREATE TABLE IF NOT EXISTS tareas (
     completada INTEGER DEFAULT 0
 )
 """)
+tareas_cambios.crear_registro(conn)
 conn.commit()
 
+# --- Modelo ---
+# Copia en memoria de la tabla, en el orden de la lista: la fila i del Listbox es
+# la tarea ids_tareas[i]. Cada cambio toca solo su fila, sin releer la tabla.
+ids_tareas = []
+tareas = {}  # id -> [texto, completada]
+
 # --- Funciones ---
+def texto_fila(tarea_id):
+    texto, completada = tareas[tarea_id]
+    texto = f"✅ {texto}" if completada else texto
+    return f"{tarea_id}. {texto}"
+
+def actualizar_fila(posicion):
+    seleccionada = lista_tareas.selection_includes(posicion)
+    lista_tareas.delete(posicion)
+    lista_tareas.insert(posicion, texto_fila(ids_tareas[posicion]))
+    if seleccionada:
+        lista_tareas.selection_set(posicion)
+
 def cargar_tareas():
+    # Solo al abrir: después cada cambio actualiza el modelo y su fila
+    ids_tareas.clear()
+    tareas.clear()
+    for tarea_id, texto, completada in cursor.execute("SELECT id, texto, completada FROM tareas ORDER BY id"):
+        ids_tareas.append(tarea_id)
+        tareas[tarea_id] = [texto, completada]
     lista_tareas.delete(0, tk.END)
-    for row in cursor.execute("SELECT id, texto, completada FROM tareas"):
-        texto = f"✅ {row[1]}" if row[2] else row[1]
-        lista_tareas.insert(tk.END, f"{row[0]}. {texto}")
+    lista_tareas.insert(tk.END, *map(texto_fila, ids_tareas))
 
 def agregar_tarea():
     tarea = entrada.get().strip()
     if tarea:
         cursor.execute("INSERT INTO tareas (texto) VALUES (?)", (tarea,))
         conn.commit()
+        # AUTOINCREMENT: el id nuevo es el mayor, va al final de la lista
+        ids_tareas.append(cursor.lastrowid)
+        tareas[cursor.lastrowid] = [tarea, 0]
+        lista_tareas.insert(tk.END, texto_fila(cursor.lastrowid))
         entrada.delete(0, tk.END)
-        cargar_tareas()
 
 def eliminar_tarea():
     seleccion = lista_tareas.curselection()
     if seleccion:
-        tarea_id = int(lista_tareas.get(seleccion[0]).split(".")[0])
+        posicion = seleccion[0]
+        tarea_id = ids_tareas[posicion]
         cursor.execute("DELETE FROM tareas WHERE id=?", (tarea_id,))
         conn.commit()
-        cargar_tareas()
+        del ids_tareas[posicion]
+        del tareas[tarea_id]
+        lista_tareas.delete(posicion)
 
 def limpiar_tareas():
     if messagebox.askyesno("¿Confirmar?", "¿Eliminar todas las tareas?"):
         cursor.execute("DELETE FROM tareas")
         cursor.execute("DELETE FROM sqlite_sequence WHERE name='tareas'")  # Reinicia el ID a 1
         conn.commit()
-        cargar_tareas()
+        ids_tareas.clear()
+        tareas.clear()
+        lista_tareas.delete(0, tk.END)
 
 def alternar_completado(event):
     seleccion = lista_tareas.curselection()
     if seleccion:
-        tarea_id = int(lista_tareas.get(seleccion[0]).split(".")[0])
-        cursor.execute("SELECT completada FROM tareas WHERE id=?", (tarea_id,))
-        estado = cursor.fetchone()[0]
-        nuevo_estado = 0 if estado == 1 else 1
+        posicion = seleccion[0]
+        tarea_id = ids_tareas[posicion]
+        nuevo_estado = 0 if tareas[tarea_id][1] == 1 else 1
         cursor.execute("UPDATE tareas SET completada=? WHERE id=?", (nuevo_estado, tarea_id))
         conn.commit()
+        tareas[tarea_id][1] = nuevo_estado
+        actualizar_fila(posicion)
+
+# --- Cambios de otras ventanas ---
+def aplicar_cambios(ids):
+    # Relee solo las tareas que cambiaron y agrega, actualiza o saca su fila
+    filas = {}
+    ids = sorted(ids)
+    for inicio in range(0, len(ids), 500):
+        parte = ids[inicio:inicio + 500]
+        marcas = ", ".join("?" * len(parte))
+        for tarea_id, texto, completada in cursor.execute(f"SELECT id, texto, completada FROM tareas WHERE id IN ({marcas})", parte):
+            filas[tarea_id] = [texto, completada]
+    for tarea_id in ids:
+        posicion = bisect_left(ids_tareas, tarea_id)
+        en_lista = posicion < len(ids_tareas) and ids_tareas[posicion] == tarea_id
+        if tarea_id not in filas:
+            if en_lista:
+                del ids_tareas[posicion]
+                del tareas[tarea_id]
+                lista_tareas.delete(posicion)
+        elif en_lista:
+            if tareas[tarea_id] != filas[tarea_id]:
+                tareas[tarea_id] = filas[tarea_id]
+                actualizar_fila(posicion)
+        else:
+            ids_tareas.insert(posicion, tarea_id)
+            tareas[tarea_id] = filas[tarea_id]
+            lista_tareas.insert(posicion, texto_fila(tarea_id))
+
+def revisar_cambios():
+    # Mientras nadie más escribe, esto es solo una consulta a PRAGMA data_version
+    ids = seguidor.cambios()
+    if ids is None:
         cargar_tareas()
+    elif ids:
+        aplicar_cambios(ids)
+    root.after(500, revisar_cambios)
 
 def actualizar_reloj():
     # Formato 12 horas con AM/PM
@@ -142,5 +211,7 @@ btn_limpiar = tk.Button(frame_entrada, text="Limpiar todo", font=("Segoe UI", 11
 btn_limpiar.pack(side="left", padx=5, ipady=5, ipadx=10)
 
 # Inicial
+seguidor = tareas_cambios.Seguidor(conn)
 cargar_tareas()
+revisar_cambios()
 root.mainloop()
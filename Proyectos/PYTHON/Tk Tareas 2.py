@@ -1,19 +1,124 @@
 import tkinter as tk
 from tkinter import messagebox, simpledialog, ttk
+from tkinter import font as tkfont
 import sqlite3
-from datetime import datetime, date
+from contextlib import contextmanager
+from array import array
+from itertools import islice
+from datetime import datetime, date, timedelta
+import tareas_cambios
+
+class Task:
+    """
+    Una tarea en memoria. Con __slots__ no lleva un dict por instancia: ocupa
+    una fracción de lo que ocupaba cada fila como diccionario, y de todos
+    modos solo se cargan las tareas que están cerca de la pantalla.
+    """
+    __slots__ = ('id', 'texto', 'completada', 'fecha_limite', 'vence')
+
+    # Día (date.toordinal) de las tareas sin fecha: después de cualquier fecha real
+    NO_DUE_DATE = date.max.toordinal() + 1
+
+    def __init__(self, id, texto, completada, fecha_limite, vence):
+        self.id = id
+        self.texto = texto
+        self.completada = bool(completada)
+        self.fecha_limite = fecha_limite
+        self.vence = vence # fecha_limite como número de día, calculado por SQLite
+
+    def sort_key(self, order):
+        """Clave de la tarea en el orden dado; la misma que Database.SORT_KEYS usa en SQL."""
+        if order == 'due':
+            return (self.vence, self.id)
+        return (self.id,)
 
 class Database:
     """
     Maneja todas las operaciones de la base de datos (SQLite).
     Esto separa la lógica de la base de datos de la lógica de la interfaz de usuario.
     """
+
+    # Triggers que mantienen tareas_fts al día con cada cambio en tareas
+    SEARCH_TRIGGERS = {
+        'tareas_fts_insert': '''
+            CREATE TRIGGER tareas_fts_insert AFTER INSERT ON tareas BEGIN
+                INSERT INTO tareas_fts (rowid, texto) VALUES (new.id, new.texto);
+            END
+        ''',
+        'tareas_fts_delete': '''
+            CREATE TRIGGER tareas_fts_delete AFTER DELETE ON tareas BEGIN
+                INSERT INTO tareas_fts (tareas_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+            END
+        ''',
+        'tareas_fts_update': '''
+            CREATE TRIGGER tareas_fts_update AFTER UPDATE OF texto ON tareas BEGIN
+                INSERT INTO tareas_fts (tareas_fts, rowid, texto) VALUES ('delete', old.id, old.texto);
+                INSERT INTO tareas_fts (rowid, texto) VALUES (new.id, new.texto);
+            END
+        ''',
+    }
+
+    # Triggers que llevan en tareas_conteo cuántas tareas hay en cada estado
+    COUNT_TRIGGERS = {
+        'tareas_conteo_insert': '''
+            CREATE TRIGGER tareas_conteo_insert AFTER INSERT ON tareas BEGIN
+                INSERT INTO tareas_conteo (completada, cantidad) VALUES (new.completada, 1)
+                    ON CONFLICT (completada) DO UPDATE SET cantidad = cantidad + 1;
+            END
+        ''',
+        'tareas_conteo_delete': '''
+            CREATE TRIGGER tareas_conteo_delete AFTER DELETE ON tareas BEGIN
+                UPDATE tareas_conteo SET cantidad = cantidad - 1 WHERE completada = old.completada;
+            END
+        ''',
+        'tareas_conteo_update': '''
+            CREATE TRIGGER tareas_conteo_update AFTER UPDATE OF completada ON tareas
+            WHEN old.completada IS NOT new.completada BEGIN
+                UPDATE tareas_conteo SET cantidad = cantidad - 1 WHERE completada = old.completada;
+                INSERT INTO tareas_conteo (completada, cantidad) VALUES (new.completada, 1)
+                    ON CONFLICT (completada) DO UPDATE SET cantidad = cantidad + 1;
+            END
+        ''',
+    }
+
+    # Columnas por las que se ordena (y se pagina) la lista. Los índices de
+    # _check_and_update_schema las cubren, y todo índice de SQLite termina en el id (rowid).
+    SORT_KEYS = {'id': ('id',), 'due': ('vence', 'id')}
+    TASK_COLUMNS = "id, texto, completada, fecha_limite, vence"
+
     def __init__(self, db_name='tareas.db'):
         """Inicializa la conexión a la base de datos y crea/actualiza la tabla."""
         self.conn = sqlite3.connect(db_name)
         self.cursor = self.conn.cursor()
+        # WAL: las lecturas no bloquean a las escrituras (varias ventanas sobre el mismo archivo)
+        # y con synchronous=NORMAL no se hace un fsync por cada cambio
+        self.cursor.execute("PRAGMA journal_mode=WAL")
+        self.cursor.execute("PRAGMA synchronous=NORMAL")
+        self._depth = 0
         self._check_and_update_schema()
 
+    @contextmanager
+    def transaction(self):
+        """
+        Agrupa varias operaciones en una sola transacción: se confirman todas
+        juntas al salir del bloque, o ninguna si hay un error. Se puede anidar;
+        solo el bloque más externo hace commit.
+        """
+        if self._depth == 0 and not self.conn.in_transaction:
+            # IMMEDIATE toma el lock de escritura al empezar, no a mitad de camino
+            self.cursor.execute("BEGIN IMMEDIATE")
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            self._depth -= 1
+            if self._depth == 0:
+                self.conn.rollback()
+            raise
+        self._depth -= 1
+        if self._depth == 0:
+            self.conn.commit()
+
     def _check_and_update_schema(self):
         """Crea la tabla si no existe y le añade la columna de fecha si es necesario."""
         self.cursor.execute('''
@@ -23,60 +128,496 @@ class Database:
                 completada INTEGER DEFAULT 0
             )
         ''')
-        # Verificar si la columna fecha_limite existe
-        self.cursor.execute("PRAGMA table_info(tareas)")
+        # Verificar si la columna fecha_limite existe (table_xinfo también lista las columnas generadas)
+        self.cursor.execute("PRAGMA table_xinfo(tareas)")
         columns = [column[1] for column in self.cursor.fetchall()]
         if 'fecha_limite' not in columns:
             self.cursor.execute("ALTER TABLE tareas ADD COLUMN fecha_limite TEXT")
+        if 'vence' not in columns:
+            # La fecha límite como número de día (el de date.toordinal), calculada por SQLite en
+            # cada escritura, también las de Tk Tareas 1: comparar vencimientos es comparar
+            # enteros, sin interpretar el texto. Sin fecha (o con una inválida), NO_DUE_DATE.
+            self.cursor.execute(f"""
+                ALTER TABLE tareas ADD COLUMN vence INTEGER GENERATED ALWAYS AS (
+                    IFNULL(CAST(julianday(fecha_limite) - 1721424.5 AS INTEGER), {Task.NO_DUE_DATE})
+                ) VIRTUAL
+            """)
+        if self.cursor.execute("PRAGMA user_version").fetchone()[0] < 1:
+            # Una sola vez: las versiones anteriores guardaban la fecha como se tipeaba (2024-3-5),
+            # que strptime acepta pero julianday no, y esas tareas quedaban como sin fecha
+            self.conn.create_function("fecha_iso", 1, self._iso_date, deterministic=True)
+            self.cursor.execute("UPDATE tareas SET fecha_limite = fecha_iso(fecha_limite) "
+                                "WHERE fecha_limite IS NOT NULL AND julianday(fecha_limite) IS NULL")
+            self.cursor.execute("PRAGMA user_version = 1")
+        # Índices para paginar por estado y por fecha sin recorrer la tabla
+        self.cursor.execute("DROP INDEX IF EXISTS idx_tareas_vence")
+        self.cursor.execute("DROP INDEX IF EXISTS idx_tareas_estado_vence")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_tareas_estado ON tareas (completada)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_tareas_vencimiento ON tareas (vence)")
+        self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_tareas_estado_vencimiento ON tareas (completada, vence)")
+        self._create_status_counts()
+        self.has_fts = self._create_search_index()
+        tareas_cambios.crear_registro(self.conn)
         self.conn.commit()
 
-    def fetch_all_tasks(self):
-        """Obtiene todas las tareas de la base de datos, ordenadas por ID."""
-        self.cursor.execute("SELECT id, texto, completada, fecha_limite FROM tareas ORDER BY id")
-        return [{'id': row[0], 'texto': row[1], 'completada': bool(row[2]), 'fecha_limite': row[3]} for row in self.cursor.fetchall()]
+    @staticmethod
+    def _iso_date(fecha):
+        """'2024-3-5' -> '2024-03-05'; lo que no es una fecha YYYY-MM-DD queda como está."""
+        try:
+            return datetime.strptime(str(fecha).strip(), "%Y-%m-%d").date().isoformat()
+        except ValueError:
+            return fecha
+
+    def _create_status_counts(self):
+        """
+        Crea tareas_conteo (cantidad de tareas por estado) y los triggers que la
+        mantienen al día con cada alta, baja o cambio de estado, también los de
+        Tk Tareas 1. Así los totales de cada filtro se leen sin contar filas.
+        """
+        if self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name='tareas_conteo'").fetchone():
+            return
+        self.cursor.execute('''
+            CREATE TABLE tareas_conteo (
+                completada INTEGER PRIMARY KEY,
+                cantidad INTEGER NOT NULL
+            )
+        ''')
+        for trigger in self.COUNT_TRIGGERS.values():
+            self.cursor.execute(trigger)
+        # Contar las tareas que ya existían
+        self.cursor.execute("INSERT INTO tareas_conteo SELECT completada, COUNT(*) FROM tareas GROUP BY completada")
+
+    def _create_search_index(self):
+        """
+        Crea el índice de búsqueda FTS5 de tareas y los triggers que lo mantienen
+        al día (también cuando escribe Tk Tareas 1). Devuelve False si el SQLite
+        de este Python no trae FTS5; en ese caso se busca recorriendo la lista.
+        """
+        if self.cursor.execute("SELECT 1 FROM sqlite_master WHERE name='tareas_fts'").fetchone():
+            return True
+        try:
+            # remove_diacritics: "cancion" encuentra "canción"; prefix: índices para 1 a 3 letras
+            self.cursor.execute('''
+                CREATE VIRTUAL TABLE tareas_fts USING fts5(
+                    texto, content='tareas', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+                )
+            ''')
+        except sqlite3.OperationalError:
+            return False
+        for trigger in self.SEARCH_TRIGGERS.values():
+            self.cursor.execute(trigger)
+        # Indexar las tareas que ya existían
+        self.cursor.execute("INSERT INTO tareas_fts (tareas_fts) VALUES ('rebuild')")
+        return True
+
+    def count_by_status(self):
+        """Cantidad de tareas pendientes y completadas: {False: pendientes, True: completadas}."""
+        counts = {False: 0, True: 0}
+        for completada, cantidad in self.cursor.execute("SELECT completada, cantidad FROM tareas_conteo"):
+            counts[bool(completada)] += cantidad
+        return counts
+
+    def fetch_tasks(self, completed=None, order='id', after=None, before=None, inclusive=False, offset=0, limit=100):
+        """
+        Una página de tareas en el orden dado ('id' o 'due'). Paginación por
+        clave: con after (o before) = Task.sort_key de una tarea ya cargada,
+        trae las que siguen (o las anteriores) usando el índice, sin contar
+        filas desde el principio. offset solo se usa para saltos de la barra.
+        """
+        key = self.SORT_KEYS[order]
+        bound = after if after is not None else before
+        forward = before is None
+        if bound is None:
+            return self._fetch_range(completed, key, [], [], forward, offset, limit)
+        # Con (vence, id) > (?, ?) SQLite solo busca en el índice por vence y recorre todo ese
+        # día (todas las tareas sin fecha, por ejemplo): la clave se recorre por tramos que sí
+        # usan el índice completo, primero el resto del día (vence = ? AND id > ?) y después
+        # los días siguientes (vence > ?).
+        tasks = []
+        for prefix in range(len(key) - 1, -1, -1):
+            op = ('>' if forward else '<') + ('=' if inclusive and prefix == len(key) - 1 else '')
+            conditions = [f"{column} = ?" for column in key[:prefix]] + [f"{key[prefix]} {op} ?"]
+            tasks += self._fetch_range(completed, key[prefix:], conditions, list(bound[:prefix + 1]), forward, 0,
+                                       limit - len(tasks))
+            if len(tasks) >= limit:
+                break
+        if not forward:
+            tasks.reverse()
+        return tasks
+
+    def _fetch_range(self, completed, order_columns, conditions, params, forward, offset, limit):
+        """Una consulta de fetch_tasks; con forward=False las filas vienen de atrás para adelante."""
+        if completed is not None:
+            conditions = ["completada = ?"] + conditions
+            params = [int(completed)] + params
+        direction = "" if forward else " DESC"
+        sql = (f"SELECT {self.TASK_COLUMNS} FROM tareas" + (" WHERE " + " AND ".join(conditions) if conditions else "") +
+               " ORDER BY " + ", ".join(column + direction for column in order_columns) + " LIMIT ? OFFSET ?")
+        return [Task(*row) for row in self.cursor.execute(sql, params + [limit, offset])]
+
+    def fetch_tasks_by_ids(self, task_ids):
+        """Las tareas con esos ids, en el mismo orden (las que ya no existen se omiten)."""
+        if not task_ids:
+            return []
+        rows = self.cursor.execute(f"SELECT {self.TASK_COLUMNS} FROM tareas WHERE id IN ({', '.join('?' * len(task_ids))})",
+                                   list(task_ids))
+        tasks = {row[0]: Task(*row) for row in rows}
+        return [tasks[task_id] for task_id in task_ids if task_id in tasks]
+
+    def search_task_ids(self, query, completed=None, order='id', limit=None):
+        """
+        Ids de las tareas con palabras que empiezan con cada término de la
+        búsqueda, como un array compacto. order: 'id', 'due' o 'rank' (las más
+        relevantes primero, bm25); limit: como mucho esa cantidad de ids. Sin
+        índice FTS5 se recorre la tabla buscando el texto dentro de cada tarea.
+        """
+        where, params = "", []
+        if completed is not None:
+            where, params = " AND t.completada = ?", [int(completed)]
+        if not self.has_fts:
+            key = ", ".join(self.SORT_KEYS.get(order, ('id',)))
+            rows = self.cursor.execute(f"SELECT t.id, t.texto FROM tareas t WHERE 1{where} ORDER BY {key}", params)
+            return array('q', islice((task_id for task_id, texto in rows if query in texto.lower()), limit))
+        terms = ['"' + term.replace('"', '""') + '"*' for term in query.split()]
+        if not terms:
+            return array('q')
+        # CROSS JOIN fija el orden: primero el índice FTS y después cada tarea por id (si no,
+        # SQLite puede recorrer tareas por estado y consultar el índice fila por fila)
+        sql = "SELECT tareas_fts.rowid FROM tareas_fts"
+        if where or order == 'due':
+            sql += " CROSS JOIN tareas t ON t.id = tareas_fts.rowid"
+        key = {'rank': "tareas_fts.rank", 'id': "tareas_fts.rowid"}.get(order) or ", ".join(self.SORT_KEYS[order])
+        try:
+            rows = self.cursor.execute(f"{sql} WHERE tareas_fts MATCH ?{where} ORDER BY {key} LIMIT ?",
+                                       [" ".join(terms)] + params + [-1 if limit is None else limit])
+        except sqlite3.OperationalError:
+            return array('q') # Términos que el tokenizador descarta por completo (solo signos)
+        return array('q', (row[0] for row in rows))
+
+    @contextmanager
+    def _suspend_triggers(self, *triggers):
+        """
+        Suspende esos triggers (los que existan) mientras dura el bloque, para
+        que una operación masiva actualice el índice de búsqueda, los conteos y
+        el registro de cambios con una sentencia cada uno: fila por fila es
+        varias veces más lento.
+        Debe usarse dentro de una transacción, así ninguna otra conexión ve la
+        tabla sin los triggers.
+        """
+        definitions = {**self.SEARCH_TRIGGERS, **self.COUNT_TRIGGERS, **tareas_cambios.TRIGGERS}
+        suspended = [name for name in triggers if self.cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type='trigger' AND name=?", (name,)).fetchone()]
+        for name in suspended:
+            self.cursor.execute("DROP TRIGGER " + name)
+        yield
+        for name in suspended:
+            self.cursor.execute(definitions[name])
+
+    def _stage_ids(self, task_ids):
+        """Carga los ids en la tabla temporal ids_en_uso, para operar sobre todos con una sentencia."""
+        self.cursor.execute("CREATE TEMP TABLE IF NOT EXISTS ids_en_uso (id INTEGER PRIMARY KEY)")
+        self.cursor.execute("DELETE FROM ids_en_uso")
+        self.cursor.executemany("INSERT OR IGNORE INTO ids_en_uso VALUES (?)", ((task_id,) for task_id in task_ids))
+
+    def _add_to_counts(self, where, params=(), sign=1):
+        """Suma (o resta, con sign=-1) a tareas_conteo las tareas que cumplen where, por estado."""
+        self.cursor.execute(f"""
+            INSERT INTO tareas_conteo (completada, cantidad)
+            SELECT completada, ? * COUNT(*) FROM tareas WHERE {where} GROUP BY completada
+            ON CONFLICT (completada) DO UPDATE SET cantidad = cantidad + excluded.cantidad
+        """, (sign,) + tuple(params))
 
     def add_task(self, texto, fecha_limite):
         """Agrega una nueva tarea a la base de datos."""
-        self.cursor.execute("INSERT INTO tareas (texto, fecha_limite) VALUES (?, ?)", (texto, fecha_limite))
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute("INSERT INTO tareas (texto, fecha_limite) VALUES (?, ?)", (texto, fecha_limite))
         return self.cursor.lastrowid
 
+    def add_tasks(self, tasks):
+        """Agrega muchas tareas (texto, fecha_limite) en una sola transacción y devuelve sus IDs."""
+        tasks = list(tasks)
+        with self.transaction():
+            # con el lock de escritura tomado, AUTOINCREMENT asigna IDs consecutivos
+            row = self.cursor.execute("SELECT seq FROM sqlite_sequence WHERE name='tareas'").fetchone()
+            first_id = (row[0] if row else 0) + 1
+            with self._suspend_triggers('tareas_fts_insert', 'tareas_conteo_insert', 'tareas_cambios_insert'):
+                self.cursor.executemany("INSERT INTO tareas (texto, fecha_limite) VALUES (?, ?)", tasks)
+                if self.has_fts:
+                    self.cursor.execute("INSERT INTO tareas_fts (rowid, texto) SELECT id, texto FROM tareas WHERE id >= ?",
+                                        (first_id,))
+                self._add_to_counts("id >= ?", (first_id,))
+                self.cursor.execute("INSERT INTO tareas_cambios (tarea) SELECT id FROM tareas WHERE id >= ?", (first_id,))
+        return list(range(first_id, first_id + len(tasks)))
+
     def delete_task(self, task_id):
         """Elimina una tarea por su ID."""
-        self.cursor.execute("DELETE FROM tareas WHERE id=?", (task_id,))
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute("DELETE FROM tareas WHERE id=?", (task_id,))
+
+    def delete_tasks(self, task_ids):
+        """Elimina muchas tareas en una sola transacción."""
+        with self.transaction():
+            self._stage_ids(task_ids)
+            with self._suspend_triggers('tareas_fts_delete', 'tareas_conteo_delete', 'tareas_cambios_delete'):
+                if self.has_fts:
+                    self.cursor.execute("INSERT INTO tareas_fts (tareas_fts, rowid, texto) "
+                                        "SELECT 'delete', id, texto FROM tareas WHERE id IN ids_en_uso")
+                self._add_to_counts("id IN ids_en_uso", sign=-1)
+                self.cursor.execute("INSERT INTO tareas_cambios (tarea) SELECT id FROM tareas WHERE id IN ids_en_uso")
+                self.cursor.execute("DELETE FROM tareas WHERE id IN ids_en_uso")
 
     def update_task_text(self, task_id, nuevo_texto):
         """Actualiza solo el texto de una tarea."""
-        self.cursor.execute("UPDATE tareas SET texto=? WHERE id=?", (nuevo_texto, task_id))
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute("UPDATE tareas SET texto=? WHERE id=?", (nuevo_texto, task_id))
 
     def update_task_date(self, task_id, fecha_limite):
         """Actualiza solo la fecha de una tarea."""
-        self.cursor.execute("UPDATE tareas SET fecha_limite=? WHERE id=?", (fecha_limite, task_id))
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute("UPDATE tareas SET fecha_limite=? WHERE id=?", (fecha_limite, task_id))
 
     def toggle_task_status(self, task_id, is_completed):
         """Cambia el estado de completado de una tarea."""
-        self.cursor.execute("UPDATE tareas SET completada=? WHERE id=?", (int(is_completed), task_id))
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute("UPDATE tareas SET completada=? WHERE id=?", (int(is_completed), task_id))
+
+    def set_status_many(self, task_ids, is_completed):
+        """Marca muchas tareas como completadas (o pendientes) en una sola transacción."""
+        status = int(is_completed)
+        with self.transaction():
+            self._stage_ids(task_ids)
+            with self._suspend_triggers('tareas_conteo_update', 'tareas_cambios_update'):
+                changing = "id IN ids_en_uso AND completada IS NOT ?"
+                self._add_to_counts(changing, (status,), sign=-1)
+                self.cursor.execute("INSERT INTO tareas_cambios (tarea) SELECT id FROM tareas WHERE " + changing, (status,))
+                self.cursor.execute("UPDATE tareas SET completada=? WHERE " + changing, (status, status))
+                self.cursor.execute("""
+                    INSERT INTO tareas_conteo (completada, cantidad) VALUES (?, ?)
+                    ON CONFLICT (completada) DO UPDATE SET cantidad = cantidad + excluded.cantidad
+                """, (status, self.cursor.rowcount))
 
     def close(self):
         """Cierra la conexión a la base de datos."""
         self.conn.close()
 
+class TaskListModel:
+    """
+    Estado de la lista de tareas, sin nada de Tk: filtro, orden, búsqueda,
+    conteos por estado y qué tareas caen en las filas que se ven. TodoApp lo
+    maneja y se ocupa solo de los widgets; sin pantalla sirve para probar y
+    medir cómo escala la vista (ver bench_tareas.py).
+    """
+    # Hasta esta cantidad de resultados se ordenan por relevancia; con más, en el orden de la lista
+    RANKED_RESULTS = 500
+
+    def __init__(self, db, rows=20):
+        """Crea la vista sobre una Database, con 'rows' filas en pantalla."""
+        self.db = db
+        # Lista virtual: se muestran 'rows' filas a partir de la fila view_top de las total_visible
+        # que pasan el filtro y la búsqueda. De la base solo se leen las tareas de page (filas
+        # page_start en adelante): la pantalla y un margen.
+        self.rows = rows
+        self.total_visible = 0
+        self.search_query = ""
+        self.search_ids = None # ids de la búsqueda actual (array), o None sin búsqueda
+        self.page = []
+        self.page_start = 0
+        self.view_top = 0
+        self.window = [] # tareas en pantalla según el último window_tasks
+        self.current_filter = 'all'
+        self.status_counts = {False: 0, True: 0} # pendientes y completadas, de tareas_conteo
+        self.sort_order = 'id'
+        # Día de hoy como date.toordinal: con Task.vence, una tarea está vencida si vence < today
+        # y vence hoy si vence == today. Cambia una sola vez por día (ver TodoApp.on_midnight).
+        self.today = date.today().toordinal()
+
+    def status_filter(self):
+        """Valor de 'completada' que pide el filtro actual (None = todas)."""
+        return {'all': None, 'completed': True, 'pending': False}[self.current_filter]
+
+    def filter_count(self):
+        """Cantidad de tareas del filtro actual, de los conteos ya leídos."""
+        completed = self.status_filter()
+        if completed is None:
+            return self.status_counts[False] + self.status_counts[True]
+        return self.status_counts[completed]
+
+    def update_status_counts(self):
+        """Lee los conteos por estado: una fila por estado, sin contar tareas."""
+        self.status_counts = self.db.count_by_status()
+
+    def task_status(self, task):
+        """Estado con que se colorea una tarea: 'completed', 'overdue', 'due_today' o None."""
+        if task.completada:
+            return 'completed'
+        if task.vence < self.today:
+            return 'overdue'
+        if task.vence == self.today:
+            return 'due_today'
+        return None
+
+    def format_task(self, task):
+        """Devuelve (texto, estado) con que se muestra una tarea."""
+        date_str = f" [{task.fecha_limite}]" if task.fecha_limite else ""
+        display_text = f"✅ {task.texto}{date_str}" if task.completada else f"   {task.texto}{date_str}"
+        return display_text, self.task_status(task)
+
+    def set_filter(self, mode):
+        """Cambia el filtro ('all', 'completed' o 'pending') y vuelve al principio de la lista."""
+        self.current_filter = mode
+        self.view_top = 0
+        self.refresh()
+
+    def toggle_sort_order(self):
+        """Alterna entre ordenar por id (orden de creación) y por fecha límite."""
+        self.sort_order = 'due' if self.sort_order == 'id' else 'id'
+        self.view_top = 0
+        self.refresh()
+
+    def set_search(self, query):
+        """Busca ese texto ('' = sin búsqueda) y vuelve al principio de la lista."""
+        self.search_query = query
+        self.view_top = 0
+        self.refresh()
+
+    def refresh(self):
+        """Vuelve a consultar el filtro y la búsqueda actuales; las filas se leen en window_tasks."""
+        completed = self.status_filter()
+        if self.search_query:
+            # una sola consulta si entran en RANKED_RESULTS: se piden por relevancia hasta uno de más,
+            # y solo si sobra se vuelve a buscar todo en el orden de la lista
+            ids = self.db.search_task_ids(self.search_query, completed, 'rank', limit=self.RANKED_RESULTS + 1)
+            if len(ids) > self.RANKED_RESULTS:
+                ids = self.db.search_task_ids(self.search_query, completed, self.sort_order)
+            self.search_ids = ids
+            self.total_visible = len(ids)
+        else:
+            self.search_ids = None
+            self.total_visible = self.filter_count()
+        self.page = []
+
+    def reload(self):
+        """
+        Después de un cambio: vuelve a leer los conteos y la pantalla a partir
+        de la primera tarea que se veía (por clave, aunque ya no exista o no
+        pase el filtro), así no hace falta recorrer ni contar desde el
+        principio de la lista.
+        """
+        self.update_status_counts()
+        if self.search_ids is not None:
+            # el texto pudo cambiar qué encuentra la búsqueda y en qué orden
+            self.refresh()
+            return
+        self.total_visible = self.filter_count()
+        if self.window:
+            anchor = self.window[0].sort_key(self.sort_order)
+            self.page = self.db.fetch_tasks(self.status_filter(), self.sort_order, after=anchor, inclusive=True,
+                                            limit=2 * self.rows)
+            self.page_start = self.view_top
+        else:
+            self.page = []
+
+    def load_rows(self, start, end):
+        """
+        Deja en page las filas start..end. Al desplazarse se sigue desde la
+        primera o la última tarea ya cargada (paginación por clave); solo un
+        salto lejano de la barra lee por posición. Se carga una pantalla de
+        margen hacia cada lado y se descarta lo que queda lejos.
+        """
+        margin = max(end - start, 1)
+        completed = self.status_filter()
+        page_end = self.page_start + len(self.page)
+        if self.search_ids is not None:
+            self.page_start = max(0, start - margin)
+            self.page = self.db.fetch_tasks_by_ids(self.search_ids[self.page_start:end + margin])
+        elif self.page and self.page_start <= start <= page_end:
+            after = self.page[-1].sort_key(self.sort_order)
+            self.page += self.db.fetch_tasks(completed, self.sort_order, after=after, limit=end - page_end + margin)
+        elif self.page and start < self.page_start <= end:
+            before = self.page[0].sort_key(self.sort_order)
+            wanted = self.page_start - start + margin
+            earlier = self.db.fetch_tasks(completed, self.sort_order, before=before, limit=wanted)
+            self.page[:0] = earlier
+            # menos de las pedidas: se llegó al principio de la lista
+            self.page_start = self.page_start - len(earlier) if len(earlier) == wanted else 0
+        else:
+            self.page_start = max(0, start - margin)
+            self.page = self.db.fetch_tasks(completed, self.sort_order, offset=self.page_start,
+                                            limit=end + margin - self.page_start)
+        # descartar lo que quedó a más de un margen de la pantalla
+        drop = start - margin - self.page_start
+        if drop > 0:
+            del self.page[:drop]
+            self.page_start += drop
+        del self.page[end + margin - self.page_start:]
+
+    def window_tasks(self):
+        """Tareas de las filas en pantalla; lee de la base solo las que no están en page."""
+        self.view_top = max(0, min(self.view_top, self.total_visible - self.rows))
+        start, end = self.view_top, min(self.view_top + self.rows, self.total_visible)
+        if not (self.page_start <= start and end <= self.page_start + len(self.page)):
+            self.load_rows(start, end)
+            if self.page_start > start:
+                # la lista se achicó por arriba desde que se contaron las filas
+                self.view_top = start = self.page_start
+        self.window = self.page[start - self.page_start:end - self.page_start]
+        return self.window
+
+    def visible_index(self, task_id):
+        """Fila de la tarea si está cargada en page, o None."""
+        for i, task in enumerate(self.page):
+            if task.id == task_id:
+                return self.page_start + i
+        return None
+
+    def scroll(self, amount):
+        """Mueve la ventana 'amount' filas (negativo = hacia arriba); window_tasks la ajusta a la lista."""
+        self.view_top += amount
+
+    def scroll_to(self, fraction):
+        """Lleva la ventana a esa fracción de la lista (0.0 = principio)."""
+        self.view_top = int(fraction * self.total_visible)
+
+    def move_selection(self, task_id, amount):
+        """
+        Mueve la selección 'amount' filas desde la tarea task_id (o desde la
+        primera fila en pantalla) y desplaza la ventana si hace falta.
+        Devuelve el id de la tarea que queda seleccionada.
+        """
+        if not self.total_visible:
+            return task_id
+        i = self.visible_index(task_id) if task_id is not None else None
+        i = self.view_top if i is None else max(0, min(self.total_visible - 1, i + amount))
+        if i < self.view_top:
+            self.view_top = i
+        elif i >= self.view_top + self.rows:
+            self.view_top = i - self.rows + 1
+        window = self.window_tasks()
+        if self.view_top <= i < self.view_top + len(window):
+            return window[i - self.view_top].id
+        return task_id
+
+
 class TodoApp:
     """
     Clase principal de la aplicación que contiene la lógica de la interfaz
     de usuario y el estado de la aplicación.
     """
+    # Cada cuánto se revisa si otra ventana cambió tareas.db
+    POLL_MS = 500
+
     def __init__(self, root):
         """Inicializa la aplicación."""
         self.root = root
         self.db = Database()
-        self.tasks = self.db.fetch_all_tasks()
-        self.visible_tasks = []
-        self.current_filter = 'all'
+        # Filtro, orden, búsqueda y filas en pantalla: el Listbox solo muestra lo que dice la vista
+        self.view = TaskListModel(self.db)
+        self.rendered_rows = [] # (texto, color) de cada fila del Listbox
+        self.rendered_tasks = []
+        self.selected_id = None
+        # Cambios que hacen otras ventanas sobre el mismo archivo (ver poll_changes)
+        self.changes = tareas_cambios.Seguidor(self.db.conn)
         self.is_dark_mode = False
 
         # --- Definición de Temas de Color ---
@@ -107,7 +648,11 @@ class TodoApp:
         self._create_widgets()
         self.apply_theme()
         self.update_clock()
+        self.schedule_midnight()
+        self.view.update_status_counts()
+        self.show_status_counts()
         self.refresh_task_list()
+        self.root.after(self.POLL_MS, self.poll_changes)
 
     def _create_widgets(self):
         """Crea y organiza todos los widgets en la ventana."""
@@ -140,6 +685,9 @@ class TodoApp:
         self.filter_buttons['all'].pack(side=tk.LEFT, padx=2)
         self.filter_buttons['completed'].pack(side=tk.LEFT, padx=2)
         self.filter_buttons['pending'].pack(side=tk.LEFT, padx=2)
+
+        self.sort_button = ttk.Button(right_controls_frame, text="Por fecha", command=self.toggle_sort_order)
+        self.sort_button.pack(side=tk.LEFT, padx=(0, 10))
         
         self.theme_button = ttk.Button(right_controls_frame, text="🌙", width=3, command=self.toggle_theme)
         self.theme_button.pack(side=tk.RIGHT)
@@ -164,15 +712,28 @@ class TodoApp:
         list_frame = ttk.Frame(self.main_frame)
         list_frame.pack(fill=tk.BOTH, expand=True, pady=5)
 
-        scrollbar = ttk.Scrollbar(list_frame)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        self.task_listbox = tk.Listbox(list_frame, yscrollcommand=scrollbar.set, font=('Helvetica', 12), highlightthickness=0, borderwidth=0)
+        # La barra no mueve el Listbox: mueve la ventana sobre las filas visibles (ver on_scroll)
+        self.scrollbar = ttk.Scrollbar(list_frame, command=self.on_scroll)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.task_listbox = tk.Listbox(list_frame, font=('Helvetica', 12), highlightthickness=0, borderwidth=0)
         self.task_listbox.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.config(command=self.task_listbox.yview)
+        # Alto de cada fila como lo calcula el Listbox: linespace + 1 + 2 * selectborderwidth.
+        # Con solo linespace entraban menos filas de las calculadas y las últimas no se veían.
+        linespace = tkfont.Font(font=self.task_listbox.cget('font')).metrics('linespace')
+        self.row_height = linespace + 1 + 2 * int(self.task_listbox.cget('selectborderwidth'))
 
         self.task_listbox.bind("<Double-Button-1>", self.toggle_task_status)
         self.task_listbox.bind("<Delete>", self.delete_task)
+        self.task_listbox.bind("<<ListboxSelect>>", self.on_select)
+        self.task_listbox.bind("<Configure>", lambda event: self.render_viewport())
+        self.task_listbox.bind("<MouseWheel>", self.on_mousewheel)
+        self.task_listbox.bind("<Button-4>", lambda event: self.scroll_rows(-3))
+        self.task_listbox.bind("<Button-5>", lambda event: self.scroll_rows(3))
+        self.task_listbox.bind("<Up>", lambda event: self.move_selection(-1))
+        self.task_listbox.bind("<Down>", lambda event: self.move_selection(1))
+        self.task_listbox.bind("<Prior>", lambda event: self.move_selection(-self.viewport_rows()))
+        self.task_listbox.bind("<Next>", lambda event: self.move_selection(self.viewport_rows()))
         
         # --- Frame Inferior: Botones de Acción ---
         bottom_frame = ttk.Frame(self.main_frame)
@@ -187,6 +748,8 @@ class TodoApp:
         
         self.status_label = ttk.Label(bottom_frame, text="Doble click para completar, 'Supr' para borrar.")
         self.status_label.pack(side=tk.RIGHT)
+        self.counts_label = ttk.Label(bottom_frame, text="")
+        self.counts_label.pack(side=tk.RIGHT, padx=(0, 15))
 
     def apply_theme(self):
         """Aplica el tema de color seleccionado a todos los widgets."""
@@ -215,10 +778,12 @@ class TodoApp:
 
         self.main_frame.config(style="TFrame")
         self.status_label.config(background=theme["bg"], foreground=theme["fg"])
+        self.counts_label.config(background=theme["bg"], foreground=theme["fg"])
         self.theme_button.config(text="☀️" if self.is_dark_mode else "🌙")
 
         self.update_filter_buttons_style()
-        self.refresh_task_list()
+        # el tema solo cambia colores: alcanza con volver a pintar las filas en pantalla
+        self.render_viewport()
 
     def toggle_theme(self):
         """Cambia entre modo claro y oscuro."""
@@ -231,49 +796,136 @@ class TodoApp:
         self.clock_label.config(text=now)
         self.root.after(1000, self.update_clock)
 
+    def poll_changes(self):
+        """
+        Aplica los cambios que hicieron otras ventanas (Tk Tareas 1 o 2). La
+        vista solo tiene en memoria los conteos y las tareas cerca de la
+        pantalla, así que aplicar cualquier cantidad de cambios es releer eso:
+        reload_page, que no depende del tamaño de la tabla.
+        """
+        changed = self.changes.cambios()
+        if changed is None or changed:
+            self.reload_page()
+        self.root.after(self.POLL_MS, self.poll_changes)
+
+    def schedule_midnight(self):
+        """Programa on_midnight para el comienzo del día siguiente."""
+        now = datetime.now()
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        # un segundo de margen: que date.today() ya sea el día nuevo cuando se ejecute
+        self.root.after(int((midnight - now).total_seconds() * 1000) + 1000, self.on_midnight)
+
+    def on_midnight(self):
+        """Cambio de día: las tareas de hoy pasan a vencidas y las de mañana a hoy."""
+        self.view.today = date.today().toordinal()
+        # solo cambian colores: render_viewport recolorea las filas en pantalla
+        self.render_viewport()
+        self.schedule_midnight()
+
     def update_filter_buttons_style(self):
         """Actualiza el estilo de los botones de filtro para resaltar el activo."""
         for mode, button in self.filter_buttons.items():
-            button.config(style="Active.TButton" if mode == self.current_filter else "TButton")
+            button.config(style="Active.TButton" if mode == self.view.current_filter else "TButton")
+
+    def get_search_query(self):
+        """Texto de búsqueda en minúsculas ('' si el campo muestra el placeholder)."""
+        if self.search_entry.cget('style') == "Placeholder.TEntry":
+            return ""
+        return self.search_entry.get().strip().lower()
+
+    def show_status_counts(self):
+        """Muestra los conteos por estado que leyó la vista."""
+        pending, completed = self.view.status_counts[False], self.view.status_counts[True]
+        self.counts_label.config(text=f"Todas: {pending + completed} · Pendientes: {pending} · Completadas: {completed}")
+
+    def format_task(self, task, theme):
+        """Devuelve (texto, color) con que se muestra una tarea."""
+        display_text, status = self.view.format_task(task)
+        return display_text, theme[status + "_fg"] if status else theme["listbox_fg"]
 
     def refresh_task_list(self):
-        """Limpia y recarga la lista de tareas en la UI aplicando filtros, búsqueda y colores."""
-        self.task_listbox.delete(0, tk.END)
-        self.visible_tasks.clear()
-        
+        """Vuelve a consultar el filtro y la búsqueda actuales, y pinta solo las filas en pantalla."""
+        self.view.refresh()
+        self.render_viewport()
+
+    def reload_page(self):
+        """Después de un cambio: relee conteos y pantalla (ver TaskListModel.reload) y repinta."""
+        self.view.reload()
+        self.show_status_counts()
+        self.render_viewport()
+
+    def viewport_rows(self):
+        """Cantidad de filas que entran enteras en el alto actual del Listbox (sin bordes)."""
+        inset = int(self.task_listbox.cget('borderwidth')) + int(self.task_listbox.cget('highlightthickness'))
+        return max(1, (self.task_listbox.winfo_height() - 2 * inset) // self.row_height)
+
+    def render_viewport(self):
+        """
+        Pinta las filas en pantalla comparando con lo que ya muestra cada
+        fila: solo se reemplazan o recolorean las filas que cambiaron.
+        """
         theme = self.dark_theme if self.is_dark_mode else self.light_theme
-        search_query = self.search_entry.get().lower()
-        if self.search_entry.cget('style') == "Placeholder.TEntry":
-            search_query = ""
-
-        today = date.today()
-
-        for task in self.tasks:
-            if (self.current_filter == 'completed' and not task['completada']) or \
-               (self.current_filter == 'pending' and task['completada']) or \
-               (search_query and search_query not in task['texto'].lower()):
-                continue
-            self.visible_tasks.append(task)
-
-        for i, task in enumerate(self.visible_tasks):
-            date_str = f" [{task['fecha_limite']}]" if task['fecha_limite'] else ""
-            display_text = f"✅ {task['texto']}{date_str}" if task['completada'] else f"   {task['texto']}{date_str}"
-            self.task_listbox.insert(tk.END, display_text)
-            
-            fg_color = theme["listbox_fg"]
-            if task['completada']:
-                fg_color = theme["completed_fg"]
-            elif task['fecha_limite']:
-                try:
-                    due_date = datetime.strptime(task['fecha_limite'], "%Y-%m-%d").date()
-                    if due_date < today:
-                        fg_color = theme["overdue_fg"]
-                    elif due_date == today:
-                        fg_color = theme["due_today_fg"]
-                except ValueError:
-                    pass # Ignorar formato de fecha inválido
-            
+        self.view.rows = self.viewport_rows()
+        window = self.view.window_tasks()
+        wanted = [self.format_task(task, theme) for task in window]
+
+        for i, (display_text, fg_color) in enumerate(wanted):
+            if i < len(self.rendered_rows):
+                if self.rendered_rows[i] == (display_text, fg_color):
+                    continue
+                if self.rendered_rows[i][0] != display_text:
+                    self.task_listbox.delete(i)
+                    self.task_listbox.insert(i, display_text)
+            else:
+                self.task_listbox.insert(tk.END, display_text)
             self.task_listbox.itemconfig(i, {'fg': fg_color})
+        if len(self.rendered_rows) > len(wanted):
+            self.task_listbox.delete(len(wanted), tk.END)
+        self.rendered_rows = wanted
+        self.rendered_tasks = window
+
+        self.task_listbox.selection_clear(0, tk.END)
+        for i, task in enumerate(window):
+            if task.id == self.selected_id:
+                self.task_listbox.selection_set(i)
+                self.task_listbox.activate(i)
+
+        total, top = self.view.total_visible, self.view.view_top
+        if total:
+            self.scrollbar.set(top / total, min(1.0, (top + len(window)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_rows(self, amount):
+        """Mueve la ventana visible 'amount' filas (negativo = hacia arriba)."""
+        self.view.scroll(amount)
+        self.render_viewport()
+        return "break"
+
+    def on_scroll(self, *args):
+        """Comandos de la barra de desplazamiento: ('moveto', fracción) o ('scroll', n, 'units'|'pages')."""
+        if args[0] == 'moveto':
+            self.view.scroll_to(float(args[1]))
+        elif args[0] == 'scroll':
+            step = self.viewport_rows() if args[2] == 'pages' else 1
+            self.view.scroll(int(args[1]) * step)
+        self.render_viewport()
+
+    def on_mousewheel(self, event):
+        """Rueda del mouse en Windows y macOS (en Linux llegan Button-4/5)."""
+        return self.scroll_rows(-3 if event.delta > 0 else 3)
+
+    def on_select(self, event=None):
+        """Recuerda la tarea elegida por id, así sigue seleccionada al desplazarse."""
+        task = self.get_selected_task()
+        self.selected_id = task.id if task else None
+
+    def move_selection(self, amount):
+        """Flechas y Re Pág/Av Pág: mueven la selección y desplazan la ventana si hace falta."""
+        self.view.rows = self.viewport_rows()
+        self.selected_id = self.view.move_selection(self.selected_id, amount)
+        self.render_viewport()
+        return "break"
 
     def add_task(self, event=None):
         """Agrega una nueva tarea, pidiendo opcionalmente una fecha."""
@@ -285,22 +937,23 @@ class TodoApp:
         fecha_limite_str = simpledialog.askstring("Fecha Límite", "Ingresa la fecha límite (YYYY-MM-DD) (Opcional):")
         if fecha_limite_str:
             try:
-                datetime.strptime(fecha_limite_str, "%Y-%m-%d")
+                # se guarda siempre con ceros (2024-3-5 -> 2024-03-05), el formato que entiende SQLite
+                fecha_limite_str = datetime.strptime(fecha_limite_str, "%Y-%m-%d").date().isoformat()
             except ValueError:
                 messagebox.showerror("Error", "Formato de fecha inválido. Use YYYY-MM-DD.")
                 return
         
-        new_id = self.db.add_task(task_text, fecha_limite_str)
-        self.tasks.append({'id': new_id, 'texto': task_text, 'completada': False, 'fecha_limite': fecha_limite_str})
+        self.db.add_task(task_text, fecha_limite_str)
         self.new_task_entry.delete(0, tk.END)
-        self.refresh_task_list()
+        self.reload_page()
 
     def get_selected_task(self):
         """Obtiene la tarea seleccionada usando un mapa interno."""
         selected_indices = self.task_listbox.curselection()
         if not selected_indices:
             return None
-        return self.visible_tasks[selected_indices[0]]
+        # la fila i del Listbox muestra rendered_tasks[i]
+        return self.rendered_tasks[selected_indices[0]]
 
     def delete_task(self, event=None):
         """Elimina la tarea seleccionada."""
@@ -309,10 +962,11 @@ class TodoApp:
             messagebox.showwarning("Advertencia", "Por favor, selecciona una tarea para eliminar.")
             return
 
-        if messagebox.askyesno("Confirmar Eliminación", f"¿Estás seguro de que quieres eliminar la tarea:\n'{selected_task['texto']}'?"):
-            self.db.delete_task(selected_task['id'])
-            self.tasks = [t for t in self.tasks if t['id'] != selected_task['id']]
-            self.refresh_task_list()
+        if messagebox.askyesno("Confirmar Eliminación", f"¿Estás seguro de que quieres eliminar la tarea:\n'{selected_task.texto}'?"):
+            self.db.delete_task(selected_task.id)
+            if self.selected_id == selected_task.id:
+                self.selected_id = None
+            self.reload_page()
 
     def edit_task(self):
         """Edita el texto de la tarea seleccionada."""
@@ -321,12 +975,12 @@ class TodoApp:
             messagebox.showwarning("Advertencia", "Por favor, selecciona una tarea para editar.")
             return
 
-        nuevo_texto = simpledialog.askstring("Editar Tarea", "Edita el texto de la tarea:", initialvalue=selected_task['texto'])
+        nuevo_texto = simpledialog.askstring("Editar Tarea", "Edita el texto de la tarea:", initialvalue=selected_task.texto)
         if nuevo_texto and nuevo_texto.strip():
             nuevo_texto = nuevo_texto.strip()
-            self.db.update_task_text(selected_task['id'], nuevo_texto)
-            selected_task['texto'] = nuevo_texto 
-            self.refresh_task_list()
+            self.db.update_task_text(selected_task.id, nuevo_texto)
+            selected_task.texto = nuevo_texto
+            self.reload_page()
         elif nuevo_texto is not None:
             messagebox.showwarning("Advertencia", "El texto de la tarea no puede estar vacío.")
 
@@ -337,38 +991,43 @@ class TodoApp:
             messagebox.showwarning("Advertencia", "Por favor, selecciona una tarea para asignarle una fecha.")
             return
 
-        fecha_limite_str = simpledialog.askstring("Asignar Fecha", "Ingresa la fecha límite (YYYY-MM-DD):", initialvalue=selected_task.get('fecha_limite', ''))
+        fecha_limite_str = simpledialog.askstring("Asignar Fecha", "Ingresa la fecha límite (YYYY-MM-DD):", initialvalue=selected_task.fecha_limite or '')
         if fecha_limite_str:
             try:
-                datetime.strptime(fecha_limite_str, "%Y-%m-%d")
-                self.db.update_task_date(selected_task['id'], fecha_limite_str)
-                selected_task['fecha_limite'] = fecha_limite_str
-                self.refresh_task_list()
+                fecha_limite_str = datetime.strptime(fecha_limite_str, "%Y-%m-%d").date().isoformat()
+                self.db.update_task_date(selected_task.id, fecha_limite_str)
+                self.reload_page()
             except ValueError:
                 messagebox.showerror("Error", "Formato de fecha inválido. Use YYYY-MM-DD.")
         elif fecha_limite_str == '': # Permitir borrar la fecha
-            self.db.update_task_date(selected_task['id'], None)
-            selected_task['fecha_limite'] = None
-            self.refresh_task_list()
+            self.db.update_task_date(selected_task.id, None)
+            self.reload_page()
 
     def toggle_task_status(self, event=None):
         """Cambia el estado de completado de la tarea seleccionada."""
         selected_task = self.get_selected_task()
         if not selected_task: return
         
-        selected_task['completada'] = not selected_task['completada']
-        self.db.toggle_task_status(selected_task['id'], selected_task['completada'])
-        self.refresh_task_list()
+        selected_task.completada = not selected_task.completada
+        self.db.toggle_task_status(selected_task.id, selected_task.completada)
+        self.reload_page()
 
     def set_filter(self, mode):
         """Establece el filtro actual y refresca la lista."""
-        self.current_filter = mode
+        self.view.set_filter(mode)
         self.update_filter_buttons_style()
-        self.refresh_task_list()
+        self.render_viewport()
+
+    def toggle_sort_order(self):
+        """Alterna entre ordenar por id (orden de creación) y por fecha límite."""
+        self.view.toggle_sort_order()
+        self.sort_button.config(text="Por id" if self.view.sort_order == 'due' else "Por fecha")
+        self.render_viewport()
 
     def on_search(self, event=None):
         """Se llama cada vez que se presiona una tecla en el campo de búsqueda."""
-        self.refresh_task_list()
+        self.view.set_search(self.get_search_query())
+        self.render_viewport()
 
     def setup_placeholder(self):
         """Configura el placeholder para el campo de búsqueda."""
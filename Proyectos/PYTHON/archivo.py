@@ -0,0 +1,283 @@
+import argparse
+import heapq
+import os
+import pathlib
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+import reportes
+from comercio_db import ComercioDB
+
+# Tablas que se llevan al archivo del mes; turnos y registro quedan en la base activa
+TABLAS = ("ventas", "venta_items", "productos")
+
+
+def inicio_mes(anio, mes):
+    """Epoch del primer segundo del mes (hora local); mes puede pasarse de 12."""
+    anio += (mes - 1) // 12
+    mes = (mes - 1) % 12 + 1
+    return time.mktime((anio, mes, 1, 0, 0, 0, 0, 0, -1))
+
+
+def nombre_archivo(db_name, anio, mes):
+    """comercio.sqlite -> comercio-2026-09.sqlite, en el mismo directorio."""
+    base, extension = os.path.splitext(db_name)
+    return base + "-" + str(anio) + "-" + str(mes).zfill(2) + extension
+
+
+def archivar_mes(db, anio, mes):
+    """
+    Mueve las ventas del mes (y sus líneas) a su archivo mensual. Devuelve la
+    cantidad de ventas que quedan en el archivo.
+    Primero se copia y se confirma el archivo; recién después, en otra
+    transacción, se borran de la base activa solo las ventas que ya están
+    copiadas y se registra la partición. Si el programa se corta en el medio,
+    las ventas siguen en la base activa y volver a archivar completa el trabajo.
+    Los borrados no descuentan nada de turnos ni de totales_encargado: no hay
+    trigger de borrado, los resúmenes siguen contando el historial completo.
+    """
+    desde, hasta = inicio_mes(anio, mes), inicio_mes(anio, mes + 1)
+    ruta = nombre_archivo(db.db_name, anio, mes)
+    db.conn.execute("ATTACH DATABASE ? AS mes", (ruta,))
+    try:
+        def copiar():
+            esquema = db.cursor.execute("SELECT type, sql FROM main.sqlite_master WHERE tbl_name IN (?,?,?) AND sql IS NOT NULL"
+                                        " AND type IN ('table', 'index') ORDER BY type DESC", TABLAS).fetchall()
+            for tipo, sql in esquema:
+                sql = sql.replace("CREATE TABLE ", "CREATE TABLE IF NOT EXISTS mes.", 1)
+                sql = sql.replace("CREATE INDEX ", "CREATE INDEX IF NOT EXISTS mes.", 1)
+                db.cursor.execute(sql)
+            db.cursor.execute("INSERT OR REPLACE INTO mes.productos SELECT * FROM main.productos")
+            db.cursor.execute("INSERT OR REPLACE INTO mes.ventas SELECT * FROM main.ventas WHERE fecha >= ? AND fecha < ?", (desde, hasta))
+            db.cursor.execute("""INSERT OR REPLACE INTO mes.venta_items SELECT i.* FROM main.ventas v
+                JOIN main.venta_items i ON i.venta = v.id WHERE v.fecha >= ? AND v.fecha < ?""", (desde, hasta))
+            return db.cursor.execute("SELECT COUNT(*) FROM mes.ventas").fetchone()[0]
+
+        def borrar():
+            db.cursor.execute("DELETE FROM main.venta_items WHERE venta IN (SELECT id FROM mes.ventas)")
+            db.cursor.execute("DELETE FROM main.ventas WHERE fecha >= ? AND fecha < ? AND id IN (SELECT id FROM mes.ventas)", (desde, hasta))
+            db.cursor.execute("""INSERT INTO particiones (mes, archivo, desde, hasta, ventas) VALUES (?,?,?,?,?)
+                ON CONFLICT (mes) DO UPDATE SET ventas = excluded.ventas""",
+                (str(anio) + "-" + str(mes).zfill(2), os.path.basename(ruta), desde, hasta, cantidad))
+
+        cantidad = db._escribir(copiar)
+        db._escribir(borrar)
+    finally:
+        db.conn.execute("DETACH DATABASE mes")
+    return cantidad
+
+
+def archivar(db, antes=None, compactar=False):
+    """
+    Archiva todos los meses que terminan antes de 'antes' (por defecto, el
+    comienzo del mes actual). Devuelve {mes: ventas archivadas}.
+    Con compactar=True hace VACUUM para que el archivo activo se achique.
+    """
+    if antes is None:
+        hoy = time.localtime()
+        antes = inicio_mes(hoy.tm_year, hoy.tm_mon)
+    primera = db.cursor.execute("SELECT MIN(fecha) FROM ventas").fetchone()[0]
+    archivados = {}
+    if primera is not None:
+        t = time.localtime(primera)
+        anio, mes = t.tm_year, t.tm_mon
+        while inicio_mes(anio, mes + 1) <= antes:
+            desde, hasta = inicio_mes(anio, mes), inicio_mes(anio, mes + 1)
+            if db.cursor.execute("SELECT 1 FROM ventas WHERE fecha >= ? AND fecha < ? LIMIT 1", (desde, hasta)).fetchone():
+                archivados[str(anio) + "-" + str(mes).zfill(2)] = archivar_mes(db, anio, mes)
+            anio, mes = anio + mes // 12, mes % 12 + 1
+    if compactar and archivados:
+        db.conn.execute("VACUUM")
+    return archivados
+
+
+class Historial:
+    """
+    Consultas por rango de fechas sobre la base activa y los archivos
+    mensuales. Cada reporte se corre solo en las particiones que se
+    superponen con el rango y los resultados se combinan en memoria.
+    """
+
+    def __init__(self, db_name="comercio.sqlite"):
+        self.db = ComercioDB(db_name)
+        self.directorio = os.path.dirname(os.path.abspath(db_name))
+        self.abiertos = {}
+
+    def particiones(self, desde=None, hasta=None):
+        """Archivos mensuales que tienen ventas entre desde y hasta."""
+        return self.db.cursor.execute("SELECT mes, archivo FROM particiones WHERE hasta > ? AND desde < ? ORDER BY desde",
+                                      (_o_menos_infinito(desde), _o_infinito(hasta))).fetchall()
+
+    def conexiones(self, desde=None, hasta=None):
+        """Conexiones (solo lectura) a las particiones del rango, más la base activa."""
+        for mes, archivo in self.particiones(desde, hasta):
+            if archivo not in self.abiertos:
+                ruta = os.path.join(self.directorio, archivo)
+                # la ruta va escapada en la URI: un '?', '#' o '%' del directorio no cambia de archivo
+                self.abiertos[archivo] = sqlite3.connect(pathlib.Path(ruta).as_uri() + "?mode=ro", uri=True)
+            yield self.abiertos[archivo]
+        # la base activa siempre entra: puede tener ventas viejas cargadas después de archivar
+        yield self.db.conn
+
+    def ventas_entre(self, desde, hasta):
+        partes = [reportes.ventas_entre(conn, desde, hasta) for conn in self.conexiones(desde, hasta)]
+        return list(heapq.merge(*partes, key=lambda venta: venta[2]))
+
+    def facturacion_por_hora(self, desde, hasta):
+        return sorted(_sumar(reportes.facturacion_por_hora(conn, desde, hasta) for conn in self.conexiones(desde, hasta)))
+
+    def mejores_clientes(self, cantidad=10, desde=None, hasta=None):
+        # cada partición devuelve todos sus clientes (LIMIT -1): el top sale de la suma
+        partes = (reportes.mejores_clientes(conn, -1, desde, hasta) for conn in self.conexiones(desde, hasta))
+        return sorted(_sumar(partes), key=lambda fila: fila[2], reverse=True)[:cantidad]
+
+    def ventas_por_producto(self, desde=None, hasta=None):
+        partes = ([((sku, nombre),) + tuple(valores) for sku, nombre, *valores in reportes.ventas_por_producto(conn, desde, hasta)]
+                  for conn in self.conexiones(desde, hasta))
+        return sorted((clave + tuple(valores) for clave, *valores in _sumar(partes)), key=lambda fila: fila[3], reverse=True)
+
+    def close(self):
+        for conn in self.abiertos.values():
+            conn.close()
+        self.db.close()
+
+
+def _o_menos_infinito(valor):
+    return valor if valor is not None else float("-inf")
+
+
+def _o_infinito(valor):
+    return valor if valor is not None else float("inf")
+
+
+def _sumar(partes):
+    """Combina filas (clave, n1, n2, ...) de varias particiones sumando por clave."""
+    acumulado = {}
+    for filas in partes:
+        for clave, *valores in filas:
+            previo = acumulado.get(clave)
+            acumulado[clave] = valores if previo is None else [a + b for a, b in zip(previo, valores)]
+    return [(clave,) + tuple(valores) for clave, valores in acumulado.items()]
+
+
+######################################################################
+# Benchmark: latencia de inserción y tamaño del backup antes y después de archivar
+
+
+def medir_base(db, muestras):
+    """Latencia de guardarVenta en la base activa, y tiempo y tamaño de un backup completo."""
+    latencias = []
+    for n in range(muestras):
+        t = time.perf_counter()
+        db.guardarVenta(("Bench", time.time(), 1, 0, 0, 1, 7.0))
+        latencias.append(time.perf_counter() - t)
+    # cortes de los percentiles 1 a 99; con una sola muestra, esa muestra es todos
+    cortes = statistics.quantiles(latencias, n=100, method="inclusive") if len(latencias) > 1 else (latencias or [0.0]) * 99
+    destino = db.db_name + ".backup"
+    inicio = time.perf_counter()
+    copia = sqlite3.connect(destino)
+    db.conn.backup(copia)
+    copia.close()
+    segundos = time.perf_counter() - inicio
+    tamanio = os.path.getsize(destino)
+    os.remove(destino)
+    return {"p50_ms": cortes[49] * 1000, "p99_ms": cortes[98] * 1000,
+            "backup_s": segundos, "backup_mb": tamanio / 1e6}
+
+
+def bench(filas, meses, muestras):
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = os.path.join(directorio, "comercio.sqlite")
+        db = ComercioDB(db_name)
+        hoy = time.localtime()
+        desde = inicio_mes(hoy.tm_year, hoy.tm_mon - meses)
+        paso = (inicio_mes(hoy.tm_year, hoy.tm_mon) - desde) / filas
+        inicio = time.perf_counter()
+        for n in range(0, filas, 50000):
+            db.guardarVentas([("Cliente " + str(i % 500), desde + i * paso, i % 3, i % 2, 0, 1, 3.0 + i % 3 * 5 + i % 2 * 6)
+                              for i in range(n, min(n + 50000, filas))])
+        print("Cargadas", filas, "ventas en", meses, "meses en", round(time.perf_counter() - inicio, 1), "s")
+
+        antes = medir_base(db, muestras)
+        inicio = time.perf_counter()
+        archivados = archivar(db, compactar=True)
+        print("Archivados", len(archivados), "meses en", round(time.perf_counter() - inicio, 1), "s")
+        despues = medir_base(db, muestras)
+        db.close()
+
+        historial = Historial(db_name)
+        mes = inicio_mes(hoy.tm_year, hoy.tm_mon - 1)
+        inicio = time.perf_counter()
+        historial.facturacion_por_hora(mes, inicio_mes(hoy.tm_year, hoy.tm_mon))
+        consulta = (time.perf_counter() - inicio) * 1000
+        historial.close()
+
+    print("".ljust(10), "p50 ms".rjust(9), "p99 ms".rjust(9), "backup s".rjust(9), "backup MB".rjust(10))
+    for nombre, datos in (("antes", antes), ("después", despues)):
+        print(nombre.ljust(10), format(datos["p50_ms"], "9.3f"), format(datos["p99_ms"], "9.3f"),
+              format(datos["backup_s"], "9.2f"), format(datos["backup_mb"], "10.1f"))
+    print("Reporte por hora del mes pasado (una partición):", round(consulta, 1), "ms")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archivo mensual de ventas de Hamburguesas IT")
+    parser.add_argument("--db", default="comercio.sqlite")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("archivar", help="mueve los meses cerrados a comercio-AAAA-MM.sqlite")
+    p.add_argument("--antes", type=reportes.leer_fecha, help="archivar solo los meses que terminan antes de esta fecha")
+    p.add_argument("--compactar", action="store_true", help="achica la base activa (VACUUM) al terminar")
+    sub.add_parser("particiones", help="lista los archivos mensuales")
+    p = sub.add_parser("entre", help="ventas entre dos fechas, en todas las particiones")
+    p.add_argument("desde", type=reportes.leer_fecha)
+    p.add_argument("hasta", type=reportes.leer_fecha)
+    p = sub.add_parser("por-hora", help="facturación por hora entre dos fechas")
+    p.add_argument("desde", type=reportes.leer_fecha)
+    p.add_argument("hasta", type=reportes.leer_fecha)
+    p = sub.add_parser("clientes", help="mejores clientes")
+    p.add_argument("-n", "--cantidad", type=int, default=10)
+    p.add_argument("--desde", type=reportes.leer_fecha)
+    p.add_argument("--hasta", type=reportes.leer_fecha)
+    p = sub.add_parser("productos", help="unidades y facturación por producto")
+    p.add_argument("--desde", type=reportes.leer_fecha)
+    p.add_argument("--hasta", type=reportes.leer_fecha)
+    p = sub.add_parser("bench", help="inserción y backup antes y después de archivar")
+    p.add_argument("-n", "--filas", type=int, default=2000000)
+    p.add_argument("--meses", type=int, default=24)
+    p.add_argument("--muestras", type=int, default=500)
+    args = parser.parse_args(argv)
+
+    if args.comando == "bench":
+        bench(args.filas, args.meses, args.muestras)
+        return 0
+    if args.comando == "archivar":
+        db = ComercioDB(args.db)
+        for mes, ventas in archivar(db, args.antes, args.compactar).items():
+            print(mes, "|", ventas, "ventas en", nombre_archivo(os.path.basename(args.db), *map(int, mes.split("-"))))
+        db.close()
+        return 0
+
+    historial = Historial(args.db)
+    if args.comando == "particiones":
+        for mes, archivo, ventas in historial.db.cursor.execute("SELECT mes, archivo, ventas FROM particiones ORDER BY desde"):
+            print(mes, "|", archivo, "|", ventas, "ventas")
+    elif args.comando == "entre":
+        for venta in historial.ventas_entre(args.desde, args.hasta):
+            print(venta[0], venta[1], time.ctime(venta[2]), *venta[3:])
+    elif args.comando == "por-hora":
+        for hora, pedidos, total in historial.facturacion_por_hora(args.desde, args.hasta):
+            print(hora, "|", pedidos, "pedidos | $", round(total, 2))
+    elif args.comando == "clientes":
+        for cliente, pedidos, total in historial.mejores_clientes(args.cantidad, args.desde, args.hasta):
+            print(cliente, "|", pedidos, "pedidos | $", round(total, 2))
+    elif args.comando == "productos":
+        for sku, nombre, unidades, total in historial.ventas_por_producto(args.desde, args.hasta):
+            print(sku, nombre, "|", unidades, "unidades | $", round(total, 2))
+    historial.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,264 @@
+import argparse
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+from comercio_db import ComercioDB, EscritorVentas
+from diario import Diario
+from precios import PRECIOS, PRODUCTOS, calcular
+
+CLIENTES = ("Ana", "Beto", "Carla", "Dario", "Elena", "Facundo", "Gabriela", "Hugo")
+
+
+def pedidos_sinteticos(cantidad, semilla=1):
+    """Genera pedidos como los arma el menú de Integrador 1/2 (mismas claves y orden)."""
+    azar = random.Random(semilla)
+    for _ in range(cantidad):
+        pedido = {"cliente": azar.choice(CLIENTES), "fecha": time.time()}
+        for producto in PRODUCTOS:
+            pedido[producto] = azar.randint(0, 3)
+        pedido["total"] = calcular(PRECIOS, pedido)
+        yield pedido
+
+
+######################################################################
+# Variantes: cada una recibe el directorio de trabajo y devuelve
+# (guardar_venta, abrir_turno, cerrar_turno, terminar, archivos que ocupa)
+
+
+def sin_turnos(encargado, ingreso):
+    """Las variantes sin tabla de turnos no necesitan abrirlos."""
+    return None
+
+
+def variante_texto(directorio):
+    """Integrador 1 original: abre, agrega y cierra ventas.txt en cada pedido."""
+    ventas = os.path.join(directorio, "ventas.txt")
+    registro = os.path.join(directorio, "registro.txt")
+
+    def guardar(pedido, turno):
+        renglon = ""
+        for n in pedido:
+            if n == "total":
+                renglon += str(pedido[n]) + "\n"
+            else:
+                renglon += str(pedido[n]) + ","
+        f = open(ventas, "a")
+        f.write(renglon)
+        f.close()
+
+    def cerrar_turno(data):
+        f = open(registro, "a")
+        f.write("IN " + time.asctime(time.localtime(data["ingreso"])) + " Encargad@ " + data["nombre"] + "\n")
+        f.write("OUT " + time.asctime(time.localtime(data["egreso"])) + " Encargad@ " + data["nombre"] + " $ " + str(data["facturado"]) + "\n")
+        f.write(("#" * 50) + "\n")
+        f.close()
+
+    return guardar, sin_turnos, cerrar_turno, lambda: None, (ventas, registro)
+
+
+def variante_sqlite_por_llamada(directorio):
+    """Integrador 2/3 original: una conexión nueva y un commit por cada pedido."""
+    base = os.path.join(directorio, "comercio.sqlite")
+
+    def guardar(pedido, turno):
+        conn = sqlite3.connect(base)
+        cursor = conn.cursor()
+        datos = tuple(pedido.values())
+        try:
+            cursor.execute("INSERT INTO ventas VALUES (null,?,?,?,?,?,?,?)", datos)
+        except sqlite3.OperationalError:
+            cursor.execute("CREATE TABLE ventas (id INTEGER PRIMARY KEY AUTOINCREMENT, cliente TEXT, fecha TEXT,"
+                           " ComboS INT, ComboD INT, ComboT INT, Flurby INT, total REAL)")
+            cursor.execute("INSERT INTO ventas VALUES (null,?,?,?,?,?,?,?)", datos)
+        conn.commit()
+        conn.close()
+
+    def cerrar_turno(data):
+        conn = sqlite3.connect(base)
+        cursor = conn.cursor()
+        filas = ((data["nombre"], data["ingreso"], "IN", 0), (data["nombre"], data["egreso"], "OUT", data["facturado"]))
+        try:
+            cursor.executemany("INSERT INTO registro VALUES (null,?,?,?,?)", filas)
+        except sqlite3.OperationalError:
+            cursor.execute("CREATE TABLE registro (id INTEGER PRIMARY KEY AUTOINCREMENT, encargado TEXT, fecha TEXT, evento TEXT, caja REAL)")
+            cursor.executemany("INSERT INTO registro VALUES (null,?,?,?,?)", filas)
+        conn.commit()
+        conn.close()
+
+    return guardar, sin_turnos, cerrar_turno, lambda: None, (base,)
+
+
+def variante_diario(directorio):
+    """Integrador 1 actual: diario binario con el archivo abierto y buffer."""
+    ventas = Diario(os.path.join(directorio, "ventas.dat"), "ventas")
+    registro = Diario(os.path.join(directorio, "registro.dat"), "registro")
+
+    def guardar(pedido, turno):
+        ventas.agregarVenta(*pedido.values())
+        ventas.flush()
+
+    def cerrar_turno(data):
+        registro.agregarTurno(data["nombre"], data["ingreso"], data["egreso"], data["facturado"])
+        ventas.flush(durable=True)
+        registro.flush(durable=True)
+
+    def terminar():
+        ventas.close()
+        registro.close()
+
+    return guardar, sin_turnos, cerrar_turno, terminar, (ventas.archivo, registro.archivo)
+
+
+def _archivos_sqlite(base):
+    return (base, base + "-wal", base + "-shm")
+
+
+def variante_comercio_db(directorio):
+    """Integrador 2 actual: una sola conexión WAL, un commit por pedido."""
+    base = os.path.join(directorio, "comercio.sqlite")
+    db = ComercioDB(base)
+
+    def guardar(pedido, turno):
+        db.guardarVenta(tuple(pedido.values()), turno)
+
+    def cerrar_turno(data):
+        data["facturado"] = db.cerrarTurno(data["turno"], data["egreso"])
+
+    return guardar, db.abrirTurno, cerrar_turno, db.close, _archivos_sqlite(base)
+
+
+def variante_escritor(directorio):
+    """Integrador 3 actual: cola de escritura diferida con commits agrupados."""
+    base = os.path.join(directorio, "comercio.sqlite")
+    db = ComercioDB(base)
+    escritor = EscritorVentas(base)
+
+    def guardar(pedido, turno):
+        escritor.encolar(tuple(pedido.values()), turno)
+
+    def cerrar_turno(data):
+        escritor.vaciar()
+        data["facturado"] = db.cerrarTurno(data["turno"], data["egreso"])
+
+    def terminar():
+        escritor.cerrar()
+        db.close()
+
+    return guardar, db.abrirTurno, cerrar_turno, terminar, _archivos_sqlite(base)
+
+
+VARIANTES = {
+    "texto": variante_texto,
+    "sqlite_por_llamada": variante_sqlite_por_llamada,
+    "diario": variante_diario,
+    "comercio_db": variante_comercio_db,
+    "escritor": variante_escritor,
+}
+
+
+######################################################################
+
+
+def percentil(ordenados, p):
+    """Percentil p (0-100) de una lista ya ordenada, por el método del rango más cercano."""
+    if not ordenados:
+        return 0.0
+    indice = max(0, min(len(ordenados) - 1, int(round(p / 100 * len(ordenados))) - 1))
+    return ordenados[indice]
+
+
+def tamanio(archivos):
+    return sum(os.path.getsize(archivo) for archivo in archivos if os.path.exists(archivo))
+
+
+def medir(nombre, pedidos, por_turno):
+    """Corre una variante con 'pedidos' pedidos, cerrando turno cada 'por_turno'."""
+    with tempfile.TemporaryDirectory() as directorio:
+        guardar, abrir_turno, cerrar_turno, terminar, archivos = VARIANTES[nombre](directorio)
+        latencias = []
+        data = None
+        inicio = time.perf_counter()
+        for n, pedido in enumerate(pedidos_sinteticos(pedidos)):
+            if n % por_turno == 0:
+                if data is not None:
+                    data["egreso"] = time.time()
+                    cerrar_turno(data)
+                ahora = time.time()
+                data = {"nombre": CLIENTES[n // por_turno % len(CLIENTES)], "ingreso": ahora, "egreso": "", "facturado": 0}
+                data["turno"] = abrir_turno(data["nombre"], ahora)
+            t = time.perf_counter()
+            guardar(pedido, data["turno"])
+            latencias.append(time.perf_counter() - t)
+            data["facturado"] += pedido["total"]
+        data["egreso"] = time.time()
+        cerrar_turno(data)
+        terminar()
+        segundos = time.perf_counter() - inicio
+        bytes_finales = tamanio(archivos)
+
+    latencias.sort()
+    return {
+        "pedidos": pedidos,
+        "segundos": segundos,
+        "pedidos_por_segundo": pedidos / segundos if segundos else 0.0,
+        "p50_ms": percentil(latencias, 50) * 1000,
+        "p95_ms": percentil(latencias, 95) * 1000,
+        "p99_ms": percentil(latencias, 99) * 1000,
+        "bytes": bytes_finales,
+        "bytes_por_pedido": bytes_finales / pedidos if pedidos else 0.0,
+    }
+
+
+def comparar(actual, anterior):
+    """Imprime la variación de pedidos/s y p99 contra un resultado anterior."""
+    for nombre, datos in actual["resultados"].items():
+        previo = anterior.get("resultados", {}).get(nombre)
+        if not previo:
+            continue
+        velocidad = (datos["pedidos_por_segundo"] / previo["pedidos_por_segundo"] - 1) * 100 if previo["pedidos_por_segundo"] else 0.0
+        p99 = (datos["p99_ms"] / previo["p99_ms"] - 1) * 100 if previo["p99_ms"] else 0.0
+        print(nombre.ljust(20), "pedidos/s", format(velocidad, "+.1f") + " %", "| p99", format(p99, "+.1f") + " %")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de persistencia de pedidos de Hamburguesas IT")
+    parser.add_argument("-n", "--pedidos", type=int, default=2000)
+    parser.add_argument("--por-turno", type=int, default=250, help="pedidos entre cambios de turno")
+    parser.add_argument("-v", "--variante", choices=VARIANTES, action="append", help="por defecto, todas")
+    parser.add_argument("--salida", default="bench_persistencia.json", help="archivo JSON con los resultados")
+    parser.add_argument("--comparar", help="resultado JSON anterior para ver regresiones")
+    args = parser.parse_args(argv)
+
+    resultado = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "pedidos": args.pedidos,
+        "por_turno": args.por_turno,
+        "resultados": {},
+    }
+    print("variante".ljust(20), "pedidos/s".rjust(10), "p50 ms".rjust(9), "p95 ms".rjust(9), "p99 ms".rjust(9), "bytes/pedido".rjust(13))
+    for nombre in args.variante or VARIANTES:
+        datos = medir(nombre, args.pedidos, args.por_turno)
+        resultado["resultados"][nombre] = datos
+        print(nombre.ljust(20), format(datos["pedidos_por_segundo"], "10.0f"), format(datos["p50_ms"], "9.3f"),
+              format(datos["p95_ms"], "9.3f"), format(datos["p99_ms"], "9.3f"), format(datos["bytes_por_pedido"], "13.1f"))
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2)
+    print("Resultados en", args.salida)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(resultado, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
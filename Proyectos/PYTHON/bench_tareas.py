@@ -0,0 +1,269 @@
+import argparse
+import importlib.util
+import inspect
+import json
+import os
+import platform
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import date, timedelta
+
+from bench_persistencia import percentil
+
+# Mide cómo escalan la base de Tk Tareas 2 y su vista (TaskListModel, sin Tk ni
+# pantalla) con la cantidad de tareas. Con --programa se mide otra copia del
+# archivo, por ejemplo la de una versión anterior sacada con git show, y con
+# --comparar se ven las diferencias contra un resultado guardado. Cada medida
+# se hace solo si esa versión tiene el método; las que faltan no aparecen.
+
+PROGRAMA = os.path.join(os.path.dirname(os.path.abspath(__file__)), "Tk Tareas 2.py")
+PALABRAS = ("casa", "trabajo", "medico", "compras", "facultad", "banco", "auto")
+TAMANIOS = (1000, 100000, 1000000)
+LOTE = 100000
+
+
+def cargar_programa(ruta):
+    """Importa Tk Tareas 2 (el nombre tiene un espacio, no se puede usar import)."""
+    spec = importlib.util.spec_from_file_location("tk_tareas_2", ruta)
+    modulo = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(modulo)
+    return modulo
+
+
+def tareas_sinteticas(desde, cantidad, hoy):
+    """Tareas (texto, fecha_limite): una de cada cinco con fecha, entre 60 días atrás y 60 adelante."""
+    for i in range(desde, desde + cantidad):
+        fecha = (hoy + timedelta(days=i % 121 - 60)).isoformat() if i % 5 == 0 else None
+        yield "tarea " + str(i) + " " + PALABRAS[i % len(PALABRAS)], fecha
+
+
+def llenar(db, cantidad):
+    """
+    Carga 'cantidad' tareas de a lotes y completa una de cada tres; devuelve
+    los segundos y con qué se cargó. Las versiones sin add_tasks confirman
+    cada add_task por separado (horas para un millón), así que se cargan con
+    SQL en una transacción sobre su propia conexión: pasan por sus triggers,
+    pero ese tiempo no se compara con el de add_tasks.
+    """
+    hoy = date.today()
+    inicio = time.perf_counter()
+    if hasattr(db, "add_tasks") and hasattr(db, "set_status_many"):
+        for desde in range(1, cantidad + 1, LOTE):
+            db.add_tasks(tareas_sinteticas(desde, min(LOTE, cantidad + 1 - desde), hoy))
+        db.set_status_many(range(3, cantidad + 1, 3), True)
+        metodo = "add_tasks"
+    else:
+        with db.conn:
+            db.conn.executemany("INSERT INTO tareas (texto, fecha_limite) VALUES (?, ?)", tareas_sinteticas(1, cantidad, hoy))
+            db.conn.execute("UPDATE tareas SET completada = 1 WHERE id % 3 = 0")
+        metodo = "sql"
+    return time.perf_counter() - inicio, metodo
+
+
+def medir(funcion, repeticiones):
+    """Corre funcion 'repeticiones' veces y devuelve p50, p95 y máximo en milisegundos."""
+    tiempos = []
+    for _ in range(repeticiones):
+        t = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - t)
+    tiempos.sort()
+    return {"p50_ms": percentil(tiempos, 50) * 1000, "p95_ms": percentil(tiempos, 95) * 1000, "max_ms": tiempos[-1] * 1000}
+
+
+######################################################################
+# Cada grupo recibe lo que necesita y devuelve {operación: medida}
+
+
+def operaciones_lectura(db, cantidad, repeticiones, azar):
+    resultados = {}
+    pocas = max(1, repeticiones // 10)
+    if hasattr(db, "fetch_all_tasks"):
+        # antes de la lista paginada, la ventana leía todas las tareas al arrancar y al refrescar
+        resultados["fetch_all_tasks"] = medir(db.fetch_all_tasks, pocas)
+    if hasattr(db, "count_by_status"):
+        resultados["count_by_status"] = medir(db.count_by_status, repeticiones)
+    elif hasattr(db, "count_tasks"):
+        resultados["count_tasks"] = medir(lambda: db.count_tasks(False), repeticiones)
+    if hasattr(db, "fetch_tasks"):
+        mitad = db.fetch_tasks(offset=cantidad // 2, limit=1)[0].sort_key('id')
+        mitad_fecha = db.fetch_tasks(None, 'due', offset=cantidad // 2, limit=1)[0].sort_key('due')
+        resultados["fetch_tasks primera pagina"] = medir(lambda: db.fetch_tasks(limit=50), repeticiones)
+        resultados["fetch_tasks por clave"] = medir(lambda: db.fetch_tasks(False, after=mitad, limit=50), repeticiones)
+        resultados["fetch_tasks por clave, fecha"] = medir(lambda: db.fetch_tasks(None, 'due', after=mitad_fecha, limit=50),
+                                                           repeticiones)
+        resultados["fetch_tasks por posicion"] = medir(lambda: db.fetch_tasks(offset=azar.randrange(cantidad), limit=50),
+                                                       repeticiones)
+    if hasattr(db, "fetch_tasks_by_ids"):
+        resultados["fetch_tasks_by_ids"] = medir(lambda: db.fetch_tasks_by_ids([azar.randint(1, cantidad) for _ in range(50)]),
+                                                 repeticiones)
+    if hasattr(db, "search_task_ids"):
+        # el orden por relevancia se pedía con ranked=True antes de que hubiera filtro y orden
+        parametros = inspect.signature(db.search_task_ids).parameters
+        por_relevancia = {"order": "rank"} if "order" in parametros else {"ranked": True}
+        resultados["search_task_ids amplia"] = medir(lambda: db.search_task_ids("medico"), pocas)
+        resultados["search_task_ids puntual"] = medir(lambda: db.search_task_ids("tarea 70 medico", **por_relevancia),
+                                                      repeticiones)
+    return resultados
+
+
+def operaciones_vista(modulo, db, cantidad, filas, repeticiones, azar):
+    vista = modulo.TaskListModel(db, filas)
+    resultados = {}
+
+    def arrancar():
+        vista.view_top = 0
+        vista.update_status_counts()
+        vista.refresh()
+        vista.window_tasks()
+    resultados["arranque"] = medir(arrancar, repeticiones)
+
+    filtros = iter(["pending", "completed", "all"] * repeticiones)
+    resultados["cambiar filtro"] = medir(lambda: (vista.set_filter(next(filtros)), vista.window_tasks()), repeticiones)
+
+    def desplazar():
+        vista.scroll(1)
+        vista.window_tasks()
+    resultados["desplazar una fila"] = medir(desplazar, repeticiones)
+
+    def saltar():
+        vista.scroll_to(azar.random())
+        vista.window_tasks()
+    resultados["saltar con la barra"] = medir(saltar, repeticiones)
+
+    def recargar():
+        vista.reload()
+        vista.window_tasks()
+    resultados["recargar tras un cambio"] = medir(recargar, repeticiones)
+
+    vista.toggle_sort_order()
+    vista.window_tasks()
+    resultados["desplazar una fila, por fecha"] = medir(desplazar, repeticiones)
+    vista.toggle_sort_order()
+
+    resultados["buscar amplia"] = medir(lambda: (vista.set_search("medico"), vista.window_tasks()), max(1, repeticiones // 10))
+    resultados["buscar puntual"] = medir(lambda: (vista.set_search("tarea 70 medico"), vista.window_tasks()), repeticiones)
+    vista.set_search("")
+    return resultados
+
+
+def operaciones_escritura(db, cantidad, repeticiones, azar):
+    hoy = date.today()
+    agregados = [] # lotes de ids que agrega add_tasks; delete_tasks borra esos mismos
+
+    def agregar_lote():
+        agregados.append(db.add_tasks(tareas_sinteticas(cantidad + 1000 * len(agregados) + 1, 1000, hoy)))
+
+    def borrar_lote():
+        db.delete_tasks(agregados.pop())
+
+    lotes = max(1, repeticiones // 10)
+    resultados = {
+        "add_task": medir(lambda: db.add_task("nueva", None), repeticiones),
+        "toggle_task_status": medir(lambda: db.toggle_task_status(azar.randint(1, cantidad), azar.random() < 0.5),
+                                    repeticiones),
+        "update_task_text": medir(lambda: db.update_task_text(azar.randint(1, cantidad), "editada medico"), repeticiones),
+    }
+    if hasattr(db, "add_tasks") and hasattr(db, "delete_tasks"):
+        resultados["add_tasks x1000"] = medir(agregar_lote, lotes)
+        resultados["delete_tasks x1000"] = medir(borrar_lote, lotes)
+    if hasattr(db, "set_status_many"):
+        resultados["set_status_many x1000"] = medir(lambda: db.set_status_many(azar.sample(range(1, cantidad + 1), 1000), True),
+                                                    lotes)
+    return resultados
+
+
+######################################################################
+
+
+def correr(modulo, cantidad, filas, repeticiones):
+    """Arma una base de 'cantidad' tareas en un directorio temporal y mide todo sobre ella."""
+    azar = random.Random(1)
+    with tempfile.TemporaryDirectory() as directorio:
+        base = os.path.join(directorio, "tareas.db")
+        db = modulo.Database(base)
+        segundos, carga = llenar(db, cantidad)
+        db.close()
+        inicio = time.perf_counter()
+        db = modulo.Database(base)
+        abrir = time.perf_counter() - inicio
+        datos = {
+            "carga_s": segundos,
+            "carga_con": carga,
+            "tareas_por_segundo": cantidad / segundos if segundos else 0.0,
+            "abrir_ms": abrir * 1000,
+            "bytes": sum(os.path.getsize(os.path.join(directorio, f)) for f in os.listdir(directorio)),
+            "operaciones": {},
+        }
+        datos["operaciones"].update(operaciones_lectura(db, cantidad, repeticiones, azar))
+        # la vista se mide desde que existe TaskListModel; antes estaba atada a los widgets
+        if hasattr(modulo, "TaskListModel"):
+            datos["operaciones"].update(operaciones_vista(modulo, db, cantidad, filas, repeticiones, azar))
+        datos["operaciones"].update(operaciones_escritura(db, cantidad, repeticiones, azar))
+        db.close()
+    return datos
+
+
+def comparar(actual, anterior):
+    """Imprime la variación del p50 de cada operación contra un resultado anterior."""
+    for cantidad, datos in actual["resultados"].items():
+        previo = anterior.get("resultados", {}).get(cantidad)
+        if not previo:
+            continue
+        for nombre, medida in datos["operaciones"].items():
+            antes = previo["operaciones"].get(nombre)
+            if not antes or not antes["p50_ms"]:
+                continue
+            cambio = (medida["p50_ms"] / antes["p50_ms"] - 1) * 100
+            print(cantidad.rjust(8), nombre.ljust(32), format(antes["p50_ms"], "10.3f"), "->",
+                  format(medida["p50_ms"], "10.3f"), "ms", format(cambio, "+7.1f") + " %")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark de la base y la vista de Tk Tareas 2 según la cantidad de tareas")
+    parser.add_argument("-n", "--tareas", type=int, action="append", help="por defecto 1000, 100000 y 1000000")
+    parser.add_argument("--filas", type=int, default=20, help="filas en pantalla de la vista")
+    parser.add_argument("-r", "--repeticiones", type=int, default=100)
+    parser.add_argument("--programa", default=PROGRAMA, help="copia de Tk Tareas 2.py a medir")
+    parser.add_argument("--etiqueta", default="", help="nombre de la versión medida, se guarda con los resultados")
+    parser.add_argument("--salida", default="bench_tareas.json", help="archivo JSON con los resultados")
+    parser.add_argument("--comparar", help="resultado JSON anterior para ver regresiones")
+    args = parser.parse_args(argv)
+
+    modulo = cargar_programa(args.programa)
+    resultado = {
+        "fecha": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "etiqueta": args.etiqueta,
+        "programa": os.path.abspath(args.programa),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "plataforma": platform.platform(),
+        "filas": args.filas,
+        "repeticiones": args.repeticiones,
+        "resultados": {},
+    }
+    for cantidad in args.tareas or TAMANIOS:
+        datos = correr(modulo, cantidad, args.filas, args.repeticiones)
+        # claves de texto, como quedan al releer el JSON
+        resultado["resultados"][str(cantidad)] = datos
+        print(cantidad, "tareas: carga", round(datos["carga_s"], 2), "s |", round(datos["tareas_por_segundo"]), "tareas/s | abrir",
+              round(datos["abrir_ms"], 1), "ms |", datos["bytes"] // 1024, "KiB")
+        print("  operación".ljust(34), "p50 ms".rjust(10), "p95 ms".rjust(10), "máx ms".rjust(10))
+        for nombre, medida in datos["operaciones"].items():
+            print("  " + nombre.ljust(32), format(medida["p50_ms"], "10.3f"), format(medida["p95_ms"], "10.3f"),
+                  format(medida["max_ms"], "10.3f"))
+
+    with open(args.salida, "w", encoding="utf-8") as f:
+        json.dump(resultado, f, indent=2)
+    print("Resultados en", args.salida)
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            comparar(resultado, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
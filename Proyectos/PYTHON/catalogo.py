@@ -0,0 +1,84 @@
+from array import array
+
+from precios import PRECIOS, PRODUCTOS
+
+# Los productos de siempre tienen SKU fijo: sus cantidades también quedan en ventas.ComboS..Flurby
+SKU_PRODUCTOS = {producto: sku for sku, producto in enumerate(PRODUCTOS, 1)}
+
+_SIN_PRODUCTO = float("nan")
+
+
+class Catalogo:
+    """
+    Catálogo de productos en memoria. Los precios se guardan en un arreglo
+    indexado directamente por SKU (array('d')), así el precio de cada línea
+    es un acceso por posición y facturar un pedido cuesta O(líneas), sin
+    importar cuántos productos tenga el menú.
+    """
+
+    def __init__(self, productos=()):
+        """productos: tuplas (sku, nombre, precio)."""
+        self.precios = array("d", [_SIN_PRODUCTO])  # la posición 0 no es un SKU válido
+        self.nombres = [None]
+        self.skus = {}
+        for sku, nombre, precio in productos:
+            self.agregar(sku, nombre, precio)
+
+    @classmethod
+    def predeterminado(cls):
+        """El menú original de Hamburguesas IT, con los precios de precios.PRECIOS."""
+        return cls((sku, producto, PRECIOS[producto]) for producto, sku in SKU_PRODUCTOS.items())
+
+    def agregar(self, sku, nombre, precio):
+        """Agrega o actualiza un producto."""
+        if sku < 1:
+            raise ValueError("el SKU debe ser un entero positivo")
+        faltan = sku + 1 - len(self.precios)
+        if faltan > 0:
+            self.precios.extend([_SIN_PRODUCTO] * faltan)
+            self.nombres.extend([None] * faltan)
+        anterior = self.nombres[sku]
+        if anterior is not None:
+            del self.skus[anterior]
+        self.precios[sku] = precio
+        self.nombres[sku] = nombre
+        self.skus[nombre] = sku
+
+    def __contains__(self, sku):
+        return 0 < sku < len(self.precios) and self.nombres[sku] is not None
+
+    def __len__(self):
+        return len(self.skus)
+
+    def precio(self, sku):
+        if sku not in self:
+            raise KeyError("SKU desconocido: " + str(sku))
+        return self.precios[sku]
+
+    def lineas(self, items):
+        """
+        Convierte (sku, cantidad) en líneas (sku, cantidad, precio unitario),
+        sumando las cantidades de un SKU repetido. Lanza KeyError si un SKU no
+        está en el catálogo y ValueError si una cantidad es negativa.
+        """
+        precios = self.precios
+        cantidades = {}
+        for sku, cantidad in items:
+            if cantidad < 0:
+                raise ValueError("cantidad negativa para el SKU " + str(sku))
+            if sku not in self:
+                raise KeyError("SKU desconocido: " + str(sku))
+            cantidades[sku] = cantidades.get(sku, 0) + cantidad
+        return [(sku, cantidad, precios[sku]) for sku, cantidad in cantidades.items() if cantidad]
+
+    def total(self, items):
+        """Costo de un pedido dado como (sku, cantidad)."""
+        return sum(cantidad * precio for sku, cantidad, precio in self.lineas(items))
+
+    def items_de_pedido(self, pedido):
+        """Pasa un pedido de los menús ({"ComboSimple": 2, ...}) a (sku, cantidad)."""
+        return [(self.skus[nombre], cantidad) for nombre, cantidad in pedido.items() if nombre in self.skus and cantidad]
+
+    def como_precios(self):
+        """Diccionario {nombre: precio}, el formato que usa precios.calcular."""
+        return {nombre: self.precios[sku] for nombre, sku in self.skus.items()}
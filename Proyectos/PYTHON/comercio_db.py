@@ -0,0 +1,562 @@
+import os
+import queue
+import random
+import sqlite3
+import threading
+import time
+
+from catalogo import SKU_PRODUCTOS, Catalogo
+from precios import PRECIOS
+
+
+def bloqueada(error):
+    """True si el error de SQLite es porque otra terminal tiene la base tomada."""
+    mensaje = str(error).lower()
+    return "locked" in mensaje or "busy" in mensaje
+
+
+def a_epoch(fecha):
+    """Convierte una fecha de time.asctime() (o ya numérica) a segundos epoch."""
+    if fecha is None or isinstance(fecha, (int, float)):
+        return fecha
+    try:
+        return time.mktime(time.strptime(fecha.strip()))
+    except ValueError:
+        try:
+            return float(fecha)
+        except ValueError:
+            return None
+
+
+class ComercioDB:
+    """
+    Maneja la base de datos de ventas de Hamburguesas IT (comercio.sqlite).
+    Se abre una sola conexión al iniciar el programa y se reutiliza para
+    cada pedido, en lugar de conectar y desconectar en cada venta.
+    Varias cajas pueden escribir en el mismo archivo: cada escritura toma el
+    lock al empezar (BEGIN IMMEDIATE) y, si la base está ocupada, se reintenta
+    con esperas crecientes hasta un límite.
+    """
+
+    SQL_VENTA = "INSERT INTO ventas (cliente, fecha, ComboS, ComboD, ComboT, Flurby, total, turno) VALUES (?,?,?,?,?,?,?,?)"
+    SQL_REGISTRO = "INSERT INTO registro VALUES (null,?,?,?,?)"
+    # el precio explícito de la línea reemplaza al que copió el trigger para los combos
+    SQL_ITEM = """INSERT INTO venta_items (venta, sku, cantidad, precio) VALUES (?,?,?,?)
+        ON CONFLICT (venta, sku) DO UPDATE SET cantidad = excluded.cantidad, precio = excluded.precio"""
+
+    # columnas de ventas con la cantidad de cada SKU del menú original (SKU 1 a 4)
+    COMBOS = ("ComboS", "ComboD", "ComboT", "Flurby")
+
+    def __init__(self, db_name="comercio.sqlite", timeout=5.0, reintentos=8):
+        """Abre la conexión, activa el modo WAL y crea las tablas una sola vez."""
+        # isolation_level=None: las transacciones las abre _escribir, no el módulo sqlite3
+        self.db_name = db_name
+        self.conn = sqlite3.connect(db_name, timeout=timeout, isolation_level=None)
+        self.cursor = self.conn.cursor()
+        self.reintentos = reintentos
+        self._con_reintentos(lambda: self.cursor.execute("PRAGMA journal_mode=WAL"))
+        # En modo WAL, NORMAL no pierde consistencia y evita un fsync por pedido
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self._ajustar_particiones = False
+        self._escribir(self._crear_tablas)
+        if self._ajustar_particiones:
+            self._ajustarParticiones()
+
+    def _con_reintentos(self, funcion):
+        """Ejecuta funcion(); si la base está bloqueada espera (backoff exponencial con azar) y reintenta."""
+        espera = 0.01
+        for intento in range(self.reintentos + 1):
+            try:
+                return funcion()
+            except sqlite3.OperationalError as e:
+                if not bloqueada(e) or intento == self.reintentos:
+                    raise
+            time.sleep(espera * (1 + random.random()))
+            espera = min(espera * 2, 1.0)
+
+    def _escribir(self, trabajo):
+        """Ejecuta trabajo() en una transacción BEGIN IMMEDIATE, con reintentos si hay bloqueo."""
+        def transaccion():
+            self.cursor.execute("BEGIN IMMEDIATE")
+            try:
+                resultado = trabajo()
+                self.cursor.execute("COMMIT")
+                return resultado
+            except BaseException:
+                if self.conn.in_transaction:
+                    self.cursor.execute("ROLLBACK")
+                raise
+        return self._con_reintentos(transaccion)
+
+    def _crear_tablas(self):
+        """Crea las tablas ventas y registro si no existen y aplica las migraciones pendientes."""
+        self.cursor.execute("""CREATE TABLE IF NOT EXISTS ventas
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            cliente TEXT,
+            fecha REAL,
+            ComboS INT,
+            ComboD INT,
+            ComboT INT,
+            Flurby INT,
+            total REAL
+        )
+        """)
+        self.cursor.execute("""CREATE TABLE IF NOT EXISTS registro
+        (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            encargado TEXT,
+            fecha REAL,
+            evento TEXT,
+            caja REAL
+        )
+        """)
+        self._migrar()
+
+    def _migrar(self):
+        """Lleva una base vieja a la versión actual del esquema (PRAGMA user_version)."""
+        version = self.cursor.execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            # Versión 1: fecha pasa de texto de time.asctime() a epoch (REAL), con índices
+            self.conn.create_function("a_epoch", 1, a_epoch, deterministic=True)
+            for tabla in ("ventas", "registro"):
+                self._fecha_a_epoch(tabla)
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_ventas_fecha ON ventas (fecha)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_ventas_cliente ON ventas (cliente, total)")
+            self.cursor.execute("CREATE INDEX IF NOT EXISTS idx_registro_fecha ON registro (fecha)")
+            self.cursor.execute("PRAGMA user_version = 1")
+        if version < 2:
+            # Versión 2: totales por turno y por encargado, mantenidos por triggers
+            self.cursor.execute("ALTER TABLE ventas ADD COLUMN turno INTEGER")
+            self.cursor.execute("""CREATE TABLE turnos
+            (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                encargado TEXT NOT NULL,
+                ingreso REAL NOT NULL,
+                egreso REAL,
+                caja REAL NOT NULL DEFAULT 0,
+                pedidos INT NOT NULL DEFAULT 0
+            )
+            """)
+            self.cursor.execute("CREATE INDEX idx_turnos_abiertos ON turnos (encargado) WHERE egreso IS NULL")
+            self.cursor.execute("""CREATE TABLE totales_encargado
+            (
+                encargado TEXT PRIMARY KEY,
+                caja REAL NOT NULL DEFAULT 0,
+                pedidos INT NOT NULL DEFAULT 0,
+                turnos INT NOT NULL DEFAULT 0
+            )
+            """)
+            self.cursor.execute("""CREATE TRIGGER ventas_suman_turno AFTER INSERT ON ventas
+            WHEN NEW.turno IS NOT NULL
+            BEGIN
+                UPDATE turnos SET caja = caja + NEW.total, pedidos = pedidos + 1 WHERE id = NEW.turno;
+                UPDATE totales_encargado SET caja = caja + NEW.total, pedidos = pedidos + 1
+                WHERE encargado = (SELECT encargado FROM turnos WHERE id = NEW.turno);
+            END
+            """)
+            self.cursor.execute("""CREATE TRIGGER turnos_suman_encargado AFTER INSERT ON turnos
+            BEGIN
+                INSERT INTO totales_encargado (encargado, turnos) VALUES (NEW.encargado, 1)
+                ON CONFLICT (encargado) DO UPDATE SET turnos = turnos + 1;
+            END
+            """)
+            self.cursor.execute("PRAGMA user_version = 2")
+        if version < 3:
+            # Versión 3: catálogo de productos y ventas por líneas
+            self.cursor.execute("""CREATE TABLE productos
+            (
+                sku INTEGER PRIMARY KEY,
+                nombre TEXT NOT NULL UNIQUE,
+                precio REAL NOT NULL,
+                activo INT NOT NULL DEFAULT 1
+            )
+            """)
+            self.cursor.executemany("INSERT INTO productos (sku, nombre, precio) VALUES (?,?,?)",
+                                    [(sku, producto, PRECIOS[producto]) for producto, sku in SKU_PRODUCTOS.items()])
+            # sin rowid: las líneas quedan guardadas juntas, ordenadas por (venta, sku)
+            self.cursor.execute("""CREATE TABLE venta_items
+            (
+                venta INTEGER NOT NULL,
+                sku INTEGER NOT NULL REFERENCES productos (sku),
+                cantidad INT NOT NULL,
+                precio REAL NOT NULL,
+                PRIMARY KEY (venta, sku)
+            ) WITHOUT ROWID
+            """)
+            self.cursor.execute("CREATE INDEX idx_items_sku ON venta_items (sku)")
+            combos = " UNION ALL ".join("SELECT " + str(sku) + " AS sku, NEW." + columna + " AS cantidad"
+                                        for sku, columna in enumerate(self.COMBOS, 1))
+            # las ventas grabadas con las columnas de siempre también tienen sus líneas
+            self.cursor.execute("""CREATE TRIGGER ventas_detallan_combos AFTER INSERT ON ventas
+            BEGIN
+                INSERT INTO venta_items (venta, sku, cantidad, precio)
+                SELECT NEW.id, c.sku, c.cantidad, p.precio
+                FROM (""" + combos + """) c JOIN productos p ON p.sku = c.sku
+                WHERE c.cantidad > 0;
+            END
+            """)
+            # el precio de las ventas viejas no se guardó: se toma el del catálogo
+            for sku, columna in enumerate(self.COMBOS, 1):
+                self.cursor.execute("INSERT INTO venta_items (venta, sku, cantidad, precio) SELECT id, ?, " + columna +
+                                    ", (SELECT precio FROM productos WHERE sku = ?) FROM ventas WHERE " + columna + " > 0",
+                                    (sku, sku))
+            self.cursor.execute("PRAGMA user_version = 3")
+        if version < 4:
+            # Versión 4: meses cerrados movidos a archivos aparte (ver archivo.py)
+            self.cursor.execute("""CREATE TABLE particiones
+            (
+                mes TEXT PRIMARY KEY,
+                archivo TEXT NOT NULL,
+                desde REAL NOT NULL,
+                hasta REAL NOT NULL,
+                ventas INT NOT NULL
+            )
+            """)
+            self.cursor.execute("PRAGMA user_version = 4")
+        if version < 5:
+            # Versión 5: eventos de cada encargado en orden, para conciliar turnos (ver conciliacion.py)
+            self.cursor.execute("CREATE INDEX idx_registro_encargado ON registro (encargado, fecha)")
+            self.cursor.execute("PRAGMA user_version = 5")
+        if version < 6:
+            # Versión 6: las líneas de las ventas grabadas por columnas llevan el precio cobrado
+            self.cursor.execute("DROP TRIGGER ventas_detallan_combos")
+            self.cursor.execute(self._triggerCombos())
+            self._ajustarItems(self.cursor)
+            # los meses ya archivados están en otros archivos: se ajustan fuera de esta transacción
+            self._ajustar_particiones = True
+            self.cursor.execute("PRAGMA user_version = 6")
+
+    @classmethod
+    def _triggerCombos(cls):
+        """
+        Trigger que arma las líneas de las ventas grabadas con las columnas de
+        siempre. Los menús cobran con sus propios precios (Integrador 3, en
+        pesos), así que el precio del catálogo se escala para que las líneas
+        sumen el total cobrado.
+        """
+        combos = " UNION ALL ".join("SELECT " + str(sku) + " AS sku, NEW." + columna + " AS cantidad"
+                                    for sku, columna in enumerate(cls.COMBOS, 1))
+        return """CREATE TRIGGER ventas_detallan_combos AFTER INSERT ON ventas
+            BEGIN
+                INSERT INTO venta_items (venta, sku, cantidad, precio)
+                SELECT NEW.id, c.sku, c.cantidad,
+                       p.precio * COALESCE(NEW.total / NULLIF(SUM(c.cantidad * p.precio) OVER (), 0), 1)
+                FROM (""" + combos + """) c JOIN productos p ON p.sku = c.sku
+                WHERE c.cantidad <> 0;
+            END
+            """
+
+    @classmethod
+    def _ajustarItems(cls, cursor):
+        """
+        Corrige las líneas que armó la versión 3 a precio de catálogo: agrega
+        las de cantidad negativa, que se salteaban, y escala los precios de
+        cada venta por columnas para que sus líneas sumen ventas.total. Las
+        ventas por líneas (guardarPedido) ya suman su total y no se tocan.
+        """
+        for sku, columna in enumerate(cls.COMBOS, 1):
+            cursor.execute("INSERT OR IGNORE INTO venta_items (venta, sku, cantidad, precio) SELECT id, ?, " + columna +
+                           ", (SELECT precio FROM productos WHERE sku = ?) FROM ventas WHERE " + columna + " < 0", (sku, sku))
+        # primero los factores: actualizar con un SUM correlativo cambiaría la suma a mitad de la venta
+        cursor.execute("""CREATE TEMP TABLE factores_items AS
+            SELECT i.venta, v.total / SUM(i.cantidad * i.precio) AS factor
+            FROM venta_items i JOIN ventas v ON v.id = i.venta
+            GROUP BY i.venta
+            HAVING MAX(i.sku) <= ? AND SUM(i.cantidad * i.precio) <> 0 AND ABS(SUM(i.cantidad * i.precio) - v.total) > 0.005""",
+                       (len(cls.COMBOS),))
+        cursor.execute("""UPDATE venta_items SET precio = precio * (SELECT factor FROM factores_items f WHERE f.venta = venta_items.venta)
+            WHERE venta IN (SELECT venta FROM factores_items)""")
+        cursor.execute("DROP TABLE factores_items")
+
+    def _ajustarParticiones(self):
+        """Aplica _ajustarItems a los meses archivados (ver archivo.py), cada uno en su archivo."""
+        directorio = os.path.dirname(os.path.abspath(self.db_name))
+        for (archivo,) in self.cursor.execute("SELECT archivo FROM particiones").fetchall():
+            ruta = os.path.join(directorio, archivo)
+            if not os.path.exists(ruta):
+                continue
+            conn = sqlite3.connect(ruta)
+            try:
+                with conn:
+                    self._ajustarItems(conn.cursor())
+            finally:
+                conn.close()
+
+    def _fecha_a_epoch(self, tabla):
+        """Reconstruye la tabla con fecha REAL si todavía tiene la columna como TEXT."""
+        columnas = self.cursor.execute("PRAGMA table_info(" + tabla + ")").fetchall()
+        tipos = {columna[1]: columna[2].upper() for columna in columnas}
+        if tipos.get("fecha") != "TEXT":
+            return
+        sql = self.cursor.execute("SELECT sql FROM sqlite_master WHERE type='table' AND name=?", (tabla,)).fetchone()[0]
+        nombres = ", ".join(columna[1] for columna in columnas)
+        convertidas = nombres.replace("fecha", "a_epoch(fecha)")
+        self.cursor.execute("ALTER TABLE " + tabla + " RENAME TO " + tabla + "_vieja")
+        self.cursor.execute(sql.replace("fecha TEXT", "fecha REAL", 1))
+        self.cursor.execute("INSERT INTO " + tabla + " (" + nombres + ") SELECT " + convertidas + " FROM " + tabla + "_vieja")
+        self.cursor.execute("DROP TABLE " + tabla + "_vieja")
+
+    def guardarVenta(self, datos, turno=None):
+        """
+        Guarda una venta: (cliente, fecha epoch, ComboS, ComboD, ComboT, Flurby, total).
+        Si se indica el turno, los triggers suman el total a la caja del turno.
+        """
+        # sqlite3 reutiliza la sentencia ya preparada porque el SQL es siempre el mismo
+        fila = tuple(datos) + (turno,)
+        self._escribir(lambda: self.cursor.execute(self.SQL_VENTA, fila))
+
+    def guardarVentas(self, lista, turno=None):
+        """Guarda muchas ventas con executemany en una sola transacción."""
+        filas = [tuple(datos) + (turno,) for datos in lista]
+        self._escribir(lambda: self.cursor.executemany(self.SQL_VENTA, filas))
+
+    def guardarPedido(self, cliente, fecha, lineas, turno=None):
+        """
+        Guarda una venta por líneas y devuelve su id. lineas son tuplas
+        (sku, cantidad, precio unitario), como las arma Catalogo.lineas.
+        Las cantidades de los SKU 1 a 4 también se copian a ComboS..Flurby,
+        para los reportes y exportaciones que leen esas columnas.
+        """
+        return self._escribir(lambda: self._insertarPedido(cliente, fecha, lineas, turno))
+
+    def _insertarPedido(self, cliente, fecha, lineas, turno):
+        """Inserta la venta y sus líneas; se llama dentro de una transacción abierta."""
+        combos = [0] * len(self.COMBOS)
+        total = 0
+        for sku, cantidad, precio in lineas:
+            if sku <= len(combos):
+                combos[sku - 1] = cantidad
+            total += cantidad * precio
+        self.cursor.execute(self.SQL_VENTA, (cliente, fecha, *combos, total, turno))
+        venta = self.cursor.lastrowid
+        self.cursor.executemany(self.SQL_ITEM, [(venta, sku, cantidad, precio) for sku, cantidad, precio in lineas])
+        return venta
+
+    def guardarProducto(self, sku, nombre, precio, activo=True):
+        """Agrega un producto al catálogo o le cambia el nombre, el precio o si está a la venta."""
+        self._escribir(lambda: self.cursor.execute("""INSERT INTO productos (sku, nombre, precio, activo) VALUES (?,?,?,?)
+            ON CONFLICT (sku) DO UPDATE SET nombre = excluded.nombre, precio = excluded.precio, activo = excluded.activo""",
+            (sku, nombre, precio, int(activo))))
+
+    def catalogo(self):
+        """Carga los productos a la venta en un Catalogo en memoria."""
+        return Catalogo(self.cursor.execute("SELECT sku, nombre, precio FROM productos WHERE activo").fetchall())
+
+    def abrirTurno(self, encargado, ingreso):
+        """
+        Abre un turno para el encargado y devuelve su id. Si el encargado ya
+        tenía un turno abierto (por ejemplo, el programa se cerró de golpe),
+        se continúa ese mismo turno con su caja intacta.
+        """
+        def abrir():
+            # dentro de la misma transacción, así dos cajas no abren dos turnos del mismo encargado
+            fila = self.cursor.execute("SELECT id FROM turnos WHERE encargado=? AND egreso IS NULL", (encargado,)).fetchone()
+            if fila:
+                return fila[0]
+            self.cursor.execute("INSERT INTO turnos (encargado, ingreso) VALUES (?,?)", (encargado, ingreso))
+            return self.cursor.lastrowid
+        return self._escribir(abrir)
+
+    def cerrarTurno(self, turno, egreso):
+        """Cierra el turno, deja el IN/OUT en registro y devuelve la caja del turno."""
+        def cerrar():
+            encargado, ingreso, caja = self.cursor.execute(
+                "SELECT encargado, ingreso, caja FROM turnos WHERE id=?", (turno,)).fetchone()
+            self.cursor.execute("UPDATE turnos SET egreso=? WHERE id=?", (egreso, turno))
+            self.cursor.executemany(self.SQL_REGISTRO, ((encargado, ingreso, "IN", 0), (encargado, egreso, "OUT", caja)))
+            return caja
+        return self._escribir(cerrar)
+
+    def cajaTurno(self, turno):
+        """Lo facturado en el turno, leído de la tabla de resumen."""
+        return self.cursor.execute("SELECT caja FROM turnos WHERE id=?", (turno,)).fetchone()[0]
+
+    def totalesEncargado(self, encargado):
+        """Devuelve (caja, pedidos, turnos) históricos del encargado."""
+        fila = self.cursor.execute("SELECT caja, pedidos, turnos FROM totales_encargado WHERE encargado=?", (encargado,)).fetchone()
+        return fila or (0, 0, 0)
+
+    def guardarRegistros(self, lista):
+        """Guarda muchas filas (encargado, fecha, evento, caja) de registro en una sola transacción."""
+        filas = [tuple(fila) for fila in lista]
+        self._escribir(lambda: self.cursor.executemany(self.SQL_REGISTRO, filas))
+
+    def guardarEncargado(self, data):
+        """Guarda el ingreso y el egreso de un encargado en una sola transacción."""
+        datosIn = (data["nombre"], data["ingreso"], "IN", 0)
+        datosOut = (data["nombre"], data["egreso"], "OUT", data["facturado"])
+        self._escribir(lambda: self.cursor.executemany(self.SQL_REGISTRO, (datosIn, datosOut)))
+
+    def close(self):
+        """Cierra la conexión a la base de datos."""
+        self.conn.close()
+
+
+class VentasSinGrabar(Exception):
+    """Quedaron ventas en la cola de EscritorVentas que no se pudieron grabar; siguen ahí para otro intento."""
+
+
+class EscritorVentas:
+    """
+    Cola de escritura diferida: los pedidos se encolan en memoria y un hilo
+    propio los graba por lotes (executemany en una sola transacción) cada
+    intervalo_ms milisegundos o cada max_filas filas, lo que ocurra primero.
+    Así la ventana del cajero nunca espera al disco. Un lote que falla se
+    reintenta solo, con esperas que se duplican hasta max_espera_s segundos.
+    """
+
+    _SALIR = object()
+
+    def __init__(self, db_name="comercio.sqlite", intervalo_ms=200, max_filas=200, max_espera_s=30):
+        """Inicia el hilo escritor, que abre su propia conexión a la base."""
+        self.db_name = db_name
+        self.intervalo = intervalo_ms / 1000
+        self.max_filas = max_filas
+        self.cola = queue.Queue()
+        self.filas_escritas = 0
+        self.lotes = 0
+        self.ultima_latencia_ms = 0.0
+        self.error = None
+        self._reintentar = []
+        self.max_espera = max_espera_s
+        self._espera_reintento = self.intervalo
+        listo = threading.Event()
+        self.hilo = threading.Thread(target=self._trabajar, args=(listo,), name="EscritorVentas", daemon=True)
+        self.hilo.start()
+        listo.wait()
+        if self.error is not None:
+            # el hilo no pudo abrir la base y ya terminó
+            raise self.error
+
+    def encolar(self, datos, turno=None):
+        """Encola una venta: (cliente, fecha epoch, ComboS, ComboD, ComboT, Flurby, total)."""
+        self.cola.put(("venta", tuple(datos) + (turno,)))
+
+    def encolarPedido(self, cliente, fecha, lineas, turno=None):
+        """Encola una venta por líneas (sku, cantidad, precio unitario), ver ComercioDB.guardarPedido."""
+        self.cola.put(("pedido", (cliente, fecha, tuple(lineas), turno)))
+
+    def vaciar(self, timeout=None):
+        """
+        Espera a que todo lo encolado quede grabado en disco de forma durable.
+        Devuelve False si se venció el timeout; si un lote no se pudo grabar,
+        lanza VentasSinGrabar (las ventas siguen en la cola para reintentar).
+        """
+        return self._esperar("vaciar", timeout)
+
+    def _esperar(self, tipo, timeout=None):
+        """Encola un aviso (vaciar o salir) y espera a que el hilo lo atienda."""
+        aviso = {"hecho": threading.Event(), "error": None}
+        self.cola.put((tipo, aviso))
+        if not aviso["hecho"].wait(timeout):
+            return False
+        if aviso["error"] is not None:
+            raise VentasSinGrabar(str(len(self._reintentar)) + " ventas sin grabar: " + str(aviso["error"])) from aviso["error"]
+        return True
+
+    def profundidad(self):
+        """Cantidad de pedidos esperando ser grabados."""
+        return self.cola.qsize()
+
+    def estadisticas(self):
+        """Devuelve los contadores de la cola para mostrarlos en pantalla."""
+        return {"pendientes": self.profundidad() + len(self._reintentar), "escritas": self.filas_escritas,
+                "lotes": self.lotes, "latencia_ms": self.ultima_latencia_ms,
+                "error": str(self.error) if self.error is not None else None}
+
+    def cerrar(self):
+        """
+        Graba lo pendiente y detiene el hilo escritor. Si algo no se pudo
+        grabar lanza VentasSinGrabar y el hilo sigue andando con esas ventas,
+        así se puede volver a intentar en lugar de perderlas.
+        """
+        if not self.hilo.is_alive():
+            # ya estaba cerrado (por ejemplo, la salida segura y después atexit)
+            return
+        self._esperar(self._SALIR)
+        self.hilo.join()
+
+    def _trabajar(self, listo):
+        """Bucle del hilo escritor: junta un lote y lo graba en una transacción."""
+        try:
+            db = ComercioDB(self.db_name)
+            # Cada lote es una sola transacción: con FULL su commit ya queda en disco (un fsync
+            # por lote, no por pedido), así vaciar() no depende de que un checkpoint pueda avanzar
+            db.conn.execute("PRAGMA synchronous=FULL")
+        except Exception as e:
+            self.error = e
+            return
+        finally:
+            listo.set()
+        salir = False
+        while not salir:
+            try:
+                # con un lote fallido no se espera al próximo pedido: vencida la espera se reintenta
+                tipo, dato = self.cola.get(timeout=self._espera_reintento if self._reintentar else None)
+            except queue.Empty:
+                tipo = None
+            lote = []
+            avisar = []
+            limite = time.monotonic() + self.intervalo
+            while tipo is not None:
+                if tipo is self._SALIR:
+                    salir = True
+                    avisar.append(dato)
+                    break
+                if tipo == "vaciar":
+                    avisar.append(dato)
+                    break
+                lote.append((tipo, dato))
+                if len(lote) >= self.max_filas:
+                    break
+                espera = limite - time.monotonic()
+                if espera <= 0:
+                    break
+                try:
+                    tipo, dato = self.cola.get(timeout=espera)
+                except queue.Empty:
+                    break
+            if self._reintentar:
+                lote = self._reintentar + lote
+                self._reintentar = []
+            if lote:
+                self._grabar(db, lote)
+            if self._reintentar:
+                # no se termina con ventas sin grabar: quien pidió salir recibe el error
+                salir = False
+            for aviso in avisar:
+                aviso["error"] = self.error if self._reintentar else None
+                aviso["hecho"].set()
+        db.close()
+
+    def _grabar(self, db, lote):
+        """Graba un lote completo con executemany en una sola transacción."""
+        inicio = time.perf_counter()
+
+        def grabar():
+            ventas = []
+            for tipo, dato in lote:
+                if tipo == "venta":
+                    ventas.append(dato)
+                    continue
+                # se respeta el orden de llegada: primero las ventas que estaban antes del pedido
+                if ventas:
+                    db.cursor.executemany(db.SQL_VENTA, ventas)
+                    ventas = []
+                db._insertarPedido(*dato)
+            if ventas:
+                db.cursor.executemany(db.SQL_VENTA, ventas)
+        try:
+            db._escribir(grabar)
+        except Exception as e:
+            # No se pierde nada: el lote se vuelve a intentar en la próxima pasada
+            self.error = e
+            self._reintentar = lote
+            self._espera_reintento = min(self._espera_reintento * 2, self.max_espera)
+            return
+        self.error = None
+        self._espera_reintento = self.intervalo
+        self.filas_escritas += len(lote)
+        self.lotes += 1
+        self.ultima_latencia_ms = (time.perf_counter() - inicio) * 1000
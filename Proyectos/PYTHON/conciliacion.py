@@ -0,0 +1,96 @@
+import argparse
+import sys
+import time
+
+from comercio_db import ComercioDB
+from reportes import leer_fecha
+
+# Arma los turnos a partir de los eventos IN/OUT de registro en una sola pasada:
+# LEAD/LAG recorren los eventos de cada encargado en el orden del índice
+# (encargado, fecha), sin ordenar en memoria ni emparejar filas en Python.
+SQL_CONCILIAR = """
+WITH eventos AS (
+    SELECT id, encargado, fecha, evento, caja,
+           LAG(evento) OVER w AS anterior,
+           LEAD(evento) OVER w AS siguiente,
+           LEAD(fecha) OVER w AS fecha_siguiente,
+           LEAD(caja) OVER w AS caja_siguiente
+    FROM registro
+    WINDOW w AS (PARTITION BY encargado ORDER BY fecha, id)
+),
+turnos_registro AS (
+    SELECT id, encargado,
+           CASE WHEN evento = 'IN' THEN fecha END AS ingreso,
+           CASE WHEN evento = 'OUT' THEN fecha WHEN siguiente = 'OUT' THEN fecha_siguiente END AS egreso,
+           CASE WHEN evento = 'OUT' THEN caja WHEN siguiente = 'OUT' THEN caja_siguiente END AS caja
+    FROM eventos
+    -- cada IN abre un turno; un OUT solo cuenta aparte si no tiene su IN antes
+    WHERE evento = 'IN' OR (evento = 'OUT' AND anterior IS NOT 'IN')
+),
+conciliados AS (
+    SELECT t.encargado, t.ingreso, t.egreso, t.caja, COALESCE(SUM(v.total), 0) AS ventas, COUNT(v.id) AS pedidos
+    FROM turnos_registro t
+    LEFT JOIN ventas v ON v.fecha >= t.ingreso AND v.fecha <= t.egreso
+         AND (v.turno IS NULL OR (SELECT tu.encargado FROM turnos tu WHERE tu.id = v.turno) = t.encargado)
+    WHERE COALESCE(t.ingreso, t.egreso) >= ? AND COALESCE(t.ingreso, t.egreso) < ?
+    GROUP BY t.id
+)
+SELECT encargado, ingreso, egreso, caja, ventas, pedidos,
+       CASE WHEN ingreso IS NULL THEN 'sin ingreso'
+            WHEN egreso IS NULL THEN 'sin cierre'
+            WHEN ABS(caja - ventas) > ? THEN 'diferencia'
+            ELSE 'ok' END AS estado
+FROM conciliados
+ORDER BY COALESCE(ingreso, egreso)
+"""
+
+
+def conciliar(conn, desde=None, hasta=None, tolerancia=0.005):
+    """
+    Reconstruye los turnos de registro y compara la caja declarada al salir
+    con la suma de las ventas entre el ingreso y el egreso. Devuelve tuplas
+    (encargado, ingreso, egreso, caja, ventas, pedidos, estado), con estado
+    'ok', 'diferencia', 'sin cierre' o 'sin ingreso'.
+    Las ventas grabadas con turno solo cuentan para el encargado de ese
+    turno; las viejas, sin turno, cuentan para todo turno que las abarque.
+    Sin 'desde', se empieza después del último mes archivado (ver archivo.py),
+    porque esas ventas ya no están en esta base.
+    """
+    if desde is None:
+        desde = conn.execute("SELECT MAX(hasta) FROM particiones").fetchone()[0]
+    return conn.execute(SQL_CONCILIAR, (desde if desde is not None else float("-inf"),
+                                        hasta if hasta is not None else float("inf"), tolerancia)).fetchall()
+
+
+def fecha(epoch):
+    return time.strftime("%Y-%m-%d %H:%M", time.localtime(epoch)) if epoch is not None else "-"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Conciliación de turnos de Hamburguesas IT contra las ventas")
+    parser.add_argument("--db", default="comercio.sqlite")
+    parser.add_argument("--desde", type=leer_fecha)
+    parser.add_argument("--hasta", type=leer_fecha)
+    parser.add_argument("--tolerancia", type=float, default=0.005, help="diferencia de caja aceptada")
+    parser.add_argument("--todos", action="store_true", help="muestra también los turnos que cierran bien")
+    args = parser.parse_args(argv)
+
+    db = ComercioDB(args.db)
+    inicio = time.perf_counter()
+    turnos = conciliar(db.conn, args.desde, args.hasta, args.tolerancia)
+    segundos = time.perf_counter() - inicio
+    db.close()
+
+    estados = {}
+    for encargado, ingreso, egreso, caja, ventas, pedidos, estado in turnos:
+        estados[estado] = estados.get(estado, 0) + 1
+        if estado != "ok" or args.todos:
+            print(fecha(ingreso), "->", fecha(egreso), "|", encargado, "| caja $", caja, "| ventas $", round(ventas, 2),
+                  "en", pedidos, "pedidos |", estado)
+    print(len(turnos), "turnos conciliados en", round(segundos, 3), "s |",
+          ", ".join(estado + ": " + str(cantidad) for estado, cantidad in sorted(estados.items())))
+    return 1 if any(estado != "ok" for estado in estados) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,237 @@
+import argparse
+import json
+import os
+import pathlib
+import sqlite3
+import struct
+import sys
+import time
+from array import array
+from itertools import islice
+
+from comercio_db import ComercioDB, a_epoch
+from diario import LectorDiario, leer_registro_txt, leer_ventas_txt
+
+# Columnas de cada tabla: (nombre, tipo). "d" = float, "q" = entero, "s" = texto
+COLUMNAS = {
+    "ventas": (("cliente", "s"), ("fecha", "d"), ("ComboS", "q"), ("ComboD", "q"),
+               ("ComboT", "q"), ("Flurby", "q"), ("total", "d")),
+    "registro": (("encargado", "s"), ("fecha", "d"), ("evento", "s"), ("caja", "d")),
+}
+
+# versión 2: cada columna lleva antes la lista de filas en NULL; la versión 1 se sigue leyendo
+FIRMA_COLUMNAR = b"HITCOL2\n"
+FIRMAS_COLUMNAR = {b"HITCOL1\n": 1, FIRMA_COLUMNAR: 2}
+ENTERO = struct.Struct("<I")
+
+
+def lotes(filas, cantidad):
+    """Agrupa un iterador de filas en listas de a 'cantidad' filas."""
+    filas = iter(filas)
+    while True:
+        lote = list(islice(filas, cantidad))
+        if not lote:
+            return
+        yield lote
+
+
+def turnos_a_registro(turnos):
+    """Convierte turnos (nombre, ingreso, egreso, facturado) en filas IN/OUT de registro."""
+    for nombre, ingreso, egreso, facturado in turnos:
+        yield (nombre, ingreso, "IN", 0.0)
+        yield (nombre, egreso, "OUT", facturado)
+
+
+######################################################################
+# Orígenes: generadores de filas, nunca cargan el archivo completo
+
+
+def leer_txt(archivo, tabla):
+    if tabla == "ventas":
+        return leer_ventas_txt(archivo)
+    return turnos_a_registro(leer_registro_txt(archivo))
+
+
+def leer_diario(archivo, tabla):
+    with LectorDiario(archivo, tabla) as lector:
+        if tabla == "ventas":
+            for cliente, fecha, cs, cd, ct, fl, total in lector.ventas():
+                yield (cliente, fecha, cs, cd, ct, fl, total)
+        else:
+            yield from turnos_a_registro(lector.turnos())
+
+
+def leer_sqlite(archivo, tabla):
+    # solo lectura: la base de origen no se migra ni se modifica.
+    # La ruta va escapada en la URI, así un '?', '#' o '%' del nombre no cambia de archivo
+    conn = sqlite3.connect(pathlib.Path(archivo).absolute().as_uri() + "?mode=ro", uri=True)
+    nombres = ", ".join(nombre for nombre, tipo in COLUMNAS[tabla])
+    try:
+        for fila in conn.execute("SELECT id, " + nombres + " FROM " + tabla + " ORDER BY id"):
+            fecha = a_epoch(fila[2])
+            if fecha is None and fila[2] is not None:
+                # se copia igual, con la fecha en NULL, en lugar de cortar la conversión a la mitad
+                print(tabla, "id", fila[0], ": fecha", repr(fila[2]), "no se entiende, queda vacía", file=sys.stderr)
+            yield fila[1:2] + (fecha,) + fila[3:]
+    finally:
+        conn.close()
+
+
+def leer_columnar(archivo, tabla=None):
+    """Recorre un archivo columnar grupo por grupo y devuelve sus filas."""
+    with open(archivo, "rb") as f:
+        tabla_archivo, columnas = _leer_cabecera(f)
+        if tabla is not None and tabla != tabla_archivo:
+            raise ValueError(archivo + " contiene la tabla " + tabla_archivo)
+        while True:
+            grupo = _leer_grupo(f, columnas)
+            if grupo is None:
+                return
+            yield from zip(*grupo)
+
+
+######################################################################
+# Destinos
+
+
+def escribir_sqlite(archivo, tabla, filas, lote, progreso):
+    """Graba en SQLite con executemany, una transacción por lote."""
+    db = ComercioDB(archivo)
+    guardar = db.guardarVentas if tabla == "ventas" else db.guardarRegistros
+    try:
+        for grupo in lotes(filas, lote):
+            guardar(grupo)
+            progreso(len(grupo))
+    finally:
+        db.close()
+
+
+def escribir_columnar(archivo, tabla, filas, lote, progreso):
+    """
+    Formato columnar propio: cabecera JSON con el esquema y luego grupos de
+    filas. Dentro de cada grupo cada columna se guarda contigua; los números
+    como arreglos binarios y los textos codificados con diccionario.
+    """
+    columnas = COLUMNAS[tabla]
+    temporal = archivo + ".tmp"
+    with open(temporal, "wb") as f:
+        esquema = json.dumps({"tabla": tabla, "columnas": columnas}).encode("utf-8")
+        f.write(FIRMA_COLUMNAR + ENTERO.pack(len(esquema)) + esquema)
+        for grupo in lotes(filas, lote):
+            f.write(ENTERO.pack(len(grupo)))
+            for i, (nombre, tipo) in enumerate(columnas):
+                valores = [fila[i] for fila in grupo]
+                f.write(_codificar(valores, tipo))
+            progreso(len(grupo))
+    os.replace(temporal, archivo)
+
+
+def _codificar(valores, tipo):
+    # los NULL se anotan aparte y en la columna ocupan un valor vacío (0 o "")
+    nulos = array("I", (i for i, valor in enumerate(valores) if valor is None))
+    if tipo == "s":
+        codigos = {}
+        indices = array("I", (codigos.setdefault("" if valor is None else str(valor), len(codigos)) for valor in valores))
+        diccionario = "\0".join(codigos).encode("utf-8")
+        datos = ENTERO.pack(len(codigos)) + ENTERO.pack(len(diccionario)) + diccionario + indices.tobytes()
+    else:
+        datos = array(tipo, (0 if valor is None else valor for valor in valores)).tobytes()
+    datos = ENTERO.pack(len(nulos)) + nulos.tobytes() + datos
+    return ENTERO.pack(len(datos)) + datos
+
+
+def _leer_cabecera(f):
+    version = FIRMAS_COLUMNAR.get(f.read(len(FIRMA_COLUMNAR)))
+    if version is None:
+        raise ValueError("no es un archivo columnar de Hamburguesas IT")
+    largo, = ENTERO.unpack(f.read(ENTERO.size))
+    esquema = json.loads(f.read(largo).decode("utf-8"))
+    return esquema["tabla"], [tuple(columna) + (version,) for columna in esquema["columnas"]]
+
+
+def _leer_grupo(f, columnas):
+    cabecera = f.read(ENTERO.size)
+    if len(cabecera) < ENTERO.size:
+        return None
+    grupo = []
+    for nombre, tipo, version in columnas:
+        largo, = ENTERO.unpack(f.read(ENTERO.size))
+        datos = f.read(largo)
+        nulos = array("I")
+        if version >= 2:
+            cantidad, = ENTERO.unpack_from(datos)
+            nulos.frombytes(datos[ENTERO.size:ENTERO.size * (1 + cantidad)])
+            datos = datos[ENTERO.size * (1 + cantidad):]
+        if tipo == "s":
+            cantidad, largo_dic = struct.unpack_from("<II", datos)
+            diccionario = datos[8:8 + largo_dic].decode("utf-8").split("\0") if cantidad else []
+            indices = array("I")
+            indices.frombytes(datos[8 + largo_dic:])
+            valores = [diccionario[i] for i in indices]
+        else:
+            valores = array(tipo)
+            valores.frombytes(datos)
+            valores = valores.tolist()
+        for i in nulos:
+            valores[i] = None
+        grupo.append(valores)
+    return grupo
+
+
+######################################################################
+
+ORIGENES = {".txt": leer_txt, ".dat": leer_diario, ".sqlite": leer_sqlite, ".db": leer_sqlite, ".hcol": leer_columnar}
+DESTINOS = {".sqlite": escribir_sqlite, ".db": escribir_sqlite, ".hcol": escribir_columnar}
+
+
+class Progreso:
+    """Cuenta filas y muestra filas por segundo cada cierto intervalo."""
+
+    def __init__(self, intervalo=1.0, salida=sys.stderr):
+        self.filas = 0
+        self.inicio = time.perf_counter()
+        self.ultimo = self.inicio
+        self.intervalo = intervalo
+        self.salida = salida
+
+    def __call__(self, cantidad):
+        self.filas += cantidad
+        ahora = time.perf_counter()
+        if ahora - self.ultimo >= self.intervalo:
+            self.ultimo = ahora
+            print(self.filas, "filas |", int(self.por_segundo()), "filas/s", file=self.salida)
+
+    def por_segundo(self):
+        segundos = time.perf_counter() - self.inicio
+        return self.filas / segundos if segundos else 0.0
+
+
+def convertir(origen, destino, tabla, lote=50000, progreso=None):
+    """Copia la tabla de origen a destino en streaming; el formato sale de la extensión."""
+    leer = ORIGENES.get(os.path.splitext(origen)[1])
+    escribir = DESTINOS.get(os.path.splitext(destino)[1])
+    if leer is None:
+        raise ValueError("origen no soportado: " + origen)
+    if escribir is None:
+        raise ValueError("destino no soportado: " + destino)
+    progreso = progreso or Progreso()
+    escribir(destino, tabla, leer(origen, tabla), lote, progreso)
+    return progreso
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importa y exporta ventas/registro entre texto, diario, SQLite y columnar")
+    parser.add_argument("origen", help="ventas.txt, registro.txt, *.dat, *.sqlite o *.hcol")
+    parser.add_argument("destino", help="*.sqlite o *.hcol")
+    parser.add_argument("--tabla", choices=COLUMNAS, default="ventas")
+    parser.add_argument("--lote", type=int, default=50000, help="filas por transacción / grupo columnar")
+    args = parser.parse_args(argv)
+
+    progreso = convertir(args.origen, args.destino, args.tabla, args.lote)
+    segundos = time.perf_counter() - progreso.inicio
+    print("Copiadas", progreso.filas, "filas en", round(segundos, 2), "s |", int(progreso.por_segundo()), "filas/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
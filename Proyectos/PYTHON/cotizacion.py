@@ -0,0 +1,88 @@
+import json
+import os
+import threading
+import time
+import urllib.request
+
+URL_DOLAR = "https://api-dolar-argentina.herokuapp.com/api/dolaroficial"
+
+
+class CacheCotizacion:
+    """
+    Guarda la cotización del dólar en memoria con un tiempo de vida (ttl).
+    Cuando el valor vence se sigue usando el último conocido mientras un hilo
+    en segundo plano lo actualiza, así que pedir una cotización nunca espera
+    a la red. El último valor también se guarda en disco para arrancar sin
+    conexión.
+    """
+
+    def __init__(self, url=URL_DOLAR, ttl=300, archivo="cotizacion.json", timeout=5):
+        """Carga el último valor guardado en disco y, si venció, lo refresca en segundo plano."""
+        self.url = url
+        self.ttl = ttl
+        self.archivo = archivo
+        self.timeout = timeout
+        self.datos = {"valor": None, "fecha": 0}
+        self.error = None
+        self._lock = threading.Lock()
+        self._refrescando = False
+        self._cargar()
+        if self._vencido():
+            self.refrescar_en_segundo_plano()
+
+    def valor(self):
+        """Devuelve la cotización en memoria (None si nunca se pudo obtener)."""
+        if self._vencido():
+            self.refrescar_en_segundo_plano()
+        return self.datos["valor"]
+
+    def refrescar(self):
+        """Consulta la API ahora mismo y actualiza la memoria y el disco."""
+        try:
+            with urllib.request.urlopen(self.url, timeout=self.timeout) as r:
+                valor = json.loads(r.read().decode("utf-8"))["venta"]
+            valor = round(float(valor))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            self.error = e
+            return False
+        self.datos = {"valor": valor, "fecha": time.time()}
+        self.error = None
+        self._guardar()
+        return True
+
+    def refrescar_en_segundo_plano(self):
+        """Lanza un refresco en otro hilo, salvo que ya haya uno en curso."""
+        with self._lock:
+            if self._refrescando:
+                return
+            self._refrescando = True
+        threading.Thread(target=self._refrescar_hilo, name="CacheCotizacion", daemon=True).start()
+
+    def _refrescar_hilo(self):
+        try:
+            self.refrescar()
+        finally:
+            with self._lock:
+                self._refrescando = False
+
+    def _vencido(self):
+        return time.time() - self.datos["fecha"] >= self.ttl
+
+    def _cargar(self):
+        """Lee el último valor conocido del disco, si existe."""
+        try:
+            with open(self.archivo, encoding="utf-8") as f:
+                datos = json.load(f)
+            self.datos = {"valor": datos["valor"], "fecha": float(datos["fecha"])}
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    def _guardar(self):
+        """Escribe el valor en disco de forma atómica (archivo temporal + reemplazo)."""
+        temporal = self.archivo + ".tmp"
+        try:
+            with open(temporal, "w", encoding="utf-8") as f:
+                json.dump(self.datos, f)
+            os.replace(temporal, self.archivo)
+        except OSError as e:
+            self.error = e
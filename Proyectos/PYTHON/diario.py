@@ -0,0 +1,301 @@
+import argparse
+import glob
+import mmap
+import os
+import struct
+import sys
+import time
+
+# Cada archivo empieza con una cabecera: firma de 8 bytes + tamaño de registro.
+CABECERA = struct.Struct("<8sI4x")
+
+# venta: fecha (epoch), cliente, ComboS, ComboD, ComboT, Flurby (con signo, como las acepta el menú), total
+VENTA = struct.Struct("<d32s4id")
+# turno: ingreso (epoch), egreso (epoch), encargado, facturado
+TURNO = struct.Struct("<dd32sd8x")
+
+FORMATOS = {
+    "ventas": (b"HITVENTA", VENTA),
+    "registro": (b"HITTURNO", TURNO),
+}
+
+
+def texto_fijo(texto, largo=32):
+    """Convierte un texto a bytes para un campo de largo fijo; lanza ValueError si no entra."""
+    datos = texto.encode("utf-8")
+    if len(datos) > largo:
+        # cortarlo perdería parte del nombre sin avisar; los .txt lo guardaban completo
+        raise ValueError("'" + texto + "' ocupa " + str(len(datos)) + " bytes, el diario admite " + str(largo))
+    return datos
+
+
+def leer_texto(datos):
+    """Inverso de texto_fijo: quita el relleno de ceros."""
+    return datos.rstrip(b"\0").decode("utf-8")
+
+
+MESES = {mes: n for n, mes in enumerate(("Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"), 1)}
+
+
+def fecha_epoch(fecha):
+    """Acepta una fecha epoch o una fecha de time.asctime() y devuelve epoch."""
+    if isinstance(fecha, (int, float)):
+        return float(fecha)
+    try:
+        # time.strptime es lento para millones de filas: se separa a mano "Sun Oct 18 09:56:54 2026"
+        _, mes, dia, hora, anio = fecha.split()
+        h, m, s = hora.split(":")
+        return time.mktime((int(anio), MESES[mes], int(dia), int(h), int(m), int(s), 0, 0, -1))
+    except (ValueError, KeyError):
+        return time.mktime(time.strptime(fecha.strip()))
+
+
+class Diario:
+    """
+    Diario binario de solo agregado, con registros de tamaño fijo.
+    El archivo queda abierto y las escrituras pasan por un buffer, en lugar
+    de abrir, escribir y cerrar el archivo de texto en cada pedido. El buffer
+    se baja a disco con fsync cada lote registros o cada intervalo_ms
+    milisegundos (se revisa al agregar), lo que ocurra primero.
+    """
+
+    def __init__(self, archivo, tipo="ventas", buffer=64 * 1024, lote=64, intervalo_ms=1000):
+        """Abre (o crea) el diario y escribe la cabecera si el archivo es nuevo."""
+        self.archivo = archivo
+        self.tipo = tipo
+        self.firma, self.registro = FORMATOS[tipo]
+        self.buffer = buffer
+        self.lote = lote
+        self.intervalo = intervalo_ms / 1000
+        self._abrir()
+
+    def _abrir(self):
+        if os.path.exists(self.archivo):
+            # un registro a medio escribir desalinearía todo lo que se agregue después
+            tamanio = os.path.getsize(self.archivo)
+            sobrante = max(tamanio - CABECERA.size, 0) % self.registro.size
+            if sobrante:
+                os.truncate(self.archivo, tamanio - sobrante)
+        self.f = open(self.archivo, "ab", buffering=self.buffer)
+        self.pendientes = 0
+        self.ultimo_fsync = time.monotonic()
+        if self.f.tell() == 0:
+            self.f.write(CABECERA.pack(self.firma, self.registro.size))
+        else:
+            validar_cabecera(self.archivo, self.tipo)
+
+    def agregarVenta(self, cliente, fecha, comboS, comboD, comboT, flurby, total):
+        """Agrega una venta al diario."""
+        self.f.write(VENTA.pack(fecha_epoch(fecha), texto_fijo(cliente), comboS, comboD, comboT, flurby, total))
+        self._agregado()
+
+    def agregarTurno(self, nombre, ingreso, egreso, facturado):
+        """Agrega un turno completo (ingreso y egreso) al diario."""
+        self.f.write(TURNO.pack(fecha_epoch(ingreso), fecha_epoch(egreso), texto_fijo(nombre), facturado))
+        self._agregado()
+
+    def _agregado(self):
+        """Cuenta el registro y, si se completó el lote o pasó el intervalo, lo baja a disco."""
+        self.pendientes += 1
+        if self.pendientes >= self.lote or time.monotonic() - self.ultimo_fsync >= self.intervalo:
+            self.flush(durable=True)
+
+    def flush(self, durable=False):
+        """Vacía el buffer al sistema operativo; con durable=True también hace fsync."""
+        self.f.flush()
+        if durable:
+            os.fsync(self.f.fileno())
+            self.pendientes = 0
+            self.ultimo_fsync = time.monotonic()
+
+    def rotar(self):
+        """Cierra el diario actual, lo renombra con la fecha y empieza uno nuevo."""
+        self.close()
+        destino = self.archivo + "." + time.strftime("%Y%m%d-%H%M%S")
+        n = 1
+        while os.path.exists(destino):
+            destino = self.archivo + "." + time.strftime("%Y%m%d-%H%M%S") + "-" + str(n)
+            n += 1
+        os.replace(self.archivo, destino)
+        self._abrir()
+        return destino
+
+    def close(self):
+        """Graba lo pendiente y cierra el archivo."""
+        if not self.f.closed:
+            self.flush(durable=True)
+            self.f.close()
+
+
+def validar_cabecera(archivo, tipo):
+    """Lanza ValueError si el archivo no es un diario del tipo indicado."""
+    firma, registro = FORMATOS[tipo]
+    with open(archivo, "rb") as f:
+        datos = f.read(CABECERA.size)
+    if len(datos) < CABECERA.size or CABECERA.unpack(datos) != (firma, registro.size):
+        raise ValueError(archivo + " no es un diario de " + tipo)
+
+
+class LectorDiario:
+    """
+    Lee un diario con mmap, sin parsear texto. Los registros se desempaquetan
+    directamente desde la memoria mapeada, así que recorrer millones de ventas
+    no carga el archivo completo. Un registro final incompleto (corte de luz
+    a mitad de una escritura) se ignora.
+    """
+
+    def __init__(self, archivo, tipo="ventas"):
+        validar_cabecera(archivo, tipo)
+        self.registro = FORMATOS[tipo][1]
+        self.f = open(archivo, "rb")
+        tamanio = os.fstat(self.f.fileno()).st_size
+        self.cantidad = (tamanio - CABECERA.size) // self.registro.size
+        self.mapa = mmap.mmap(self.f.fileno(), 0, access=mmap.ACCESS_READ) if self.cantidad else None
+
+    def __len__(self):
+        return self.cantidad
+
+    def registros(self):
+        """Recorre los registros como tuplas (el texto queda en bytes con relleno)."""
+        if not self.cantidad:
+            return iter(())
+        fin = CABECERA.size + self.cantidad * self.registro.size
+        return self.registro.iter_unpack(memoryview(self.mapa)[CABECERA.size:fin])
+
+    def ventas(self):
+        """Recorre las ventas con el cliente ya decodificado."""
+        for fecha, cliente, cs, cd, ct, fl, total in self.registros():
+            yield (leer_texto(cliente), fecha, cs, cd, ct, fl, total)
+
+    def turnos(self):
+        """Recorre los turnos con el encargado ya decodificado."""
+        for ingreso, egreso, nombre, facturado in self.registros():
+            yield (leer_texto(nombre), ingreso, egreso, facturado)
+
+    def close(self):
+        if self.mapa is not None:
+            self.mapa.close()
+        self.f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def leer_ventas_txt(archivo):
+    """Recorre ventas.txt (formato de Integrador 1) y devuelve tuplas de venta."""
+    with open(archivo, encoding="utf-8") as f:
+        for linea in f:
+            linea = linea.strip()
+            if not linea:
+                continue
+            # el cliente puede tener comas, los otros 6 campos no
+            cliente, fecha, cs, cd, ct, fl, total = linea.rsplit(",", 6)
+            yield (cliente, fecha_epoch(fecha), int(cs), int(cd), int(ct), int(fl), float(total))
+
+
+def leer_registro_txt(archivo):
+    """Recorre registro.txt (formato de Integrador 1) y devuelve tuplas de turno."""
+    ingreso = None
+    with open(archivo, encoding="utf-8") as f:
+        for linea in f:
+            linea = linea.rstrip("\n")
+            if linea.startswith("IN "):
+                fecha, _, nombre = linea[3:].partition(" Encargad@ ")
+                ingreso = fecha_epoch(fecha)
+            elif linea.startswith("OUT "):
+                fecha, _, resto = linea[4:].partition(" Encargad@ ")
+                nombre, _, facturado = resto.rpartition(" $ ")
+                yield (nombre, ingreso if ingreso is not None else fecha_epoch(fecha), fecha_epoch(fecha), float(facturado))
+                ingreso = None
+
+
+def convertir(origen, destino, tipo):
+    """Convierte ventas.txt o registro.txt al diario binario. Devuelve la cantidad de registros."""
+    diario = Diario(destino, tipo)
+    n = 0
+    if tipo == "ventas":
+        for venta in leer_ventas_txt(origen):
+            diario.agregarVenta(*venta)
+            n += 1
+    else:
+        for turno in leer_registro_txt(origen):
+            diario.agregarTurno(*turno)
+            n += 1
+    diario.close()
+    return n
+
+
+def compactar(archivo, tipo):
+    """
+    Une el diario y sus segmentos rotados (archivo.AAAAMMDD-HHMMSS) en un solo
+    archivo, descartando registros incompletos. Devuelve la cantidad de registros.
+    """
+    segmentos = sorted(glob.glob(glob.escape(archivo) + ".*"))
+    segmentos = [s for s in segmentos if not s.endswith(".tmp")]
+    if os.path.exists(archivo):
+        segmentos.append(archivo)
+    firma, registro = FORMATOS[tipo]
+    temporal = archivo + ".tmp"
+    n = 0
+    with open(temporal, "wb") as salida:
+        salida.write(CABECERA.pack(firma, registro.size))
+        for segmento in segmentos:
+            with LectorDiario(segmento, tipo) as lector:
+                if lector.cantidad:
+                    salida.write(lector.mapa[CABECERA.size:CABECERA.size + lector.cantidad * registro.size])
+                    n += lector.cantidad
+        salida.flush()
+        os.fsync(salida.fileno())
+    os.replace(temporal, archivo)
+    for segmento in segmentos:
+        if segmento != archivo:
+            os.remove(segmento)
+    return n
+
+
+def resumen(archivo, tipo):
+    """Cuenta registros y suma el total facturado recorriendo el diario con mmap."""
+    total = 0.0
+    with LectorDiario(archivo, tipo) as lector:
+        for fila in lector.registros():
+            total += fila[-1]
+        return len(lector), total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Diario binario de ventas de Hamburguesas IT")
+    parser.add_argument("--tipo", choices=FORMATOS, default="ventas")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("convertir", help="convierte ventas.txt / registro.txt al diario")
+    p.add_argument("origen")
+    p.add_argument("destino")
+    p = sub.add_parser("resumen", help="cantidad de registros y total facturado")
+    p.add_argument("archivo")
+    p = sub.add_parser("rotar", help="cierra el diario actual y empieza uno nuevo")
+    p.add_argument("archivo")
+    p = sub.add_parser("compactar", help="une el diario con sus segmentos rotados")
+    p.add_argument("archivo")
+    args = parser.parse_args(argv)
+
+    if args.comando == "convertir":
+        n = convertir(args.origen, args.destino, args.tipo)
+        print("Convertidos", n, "registros a", args.destino)
+    elif args.comando == "resumen":
+        inicio = time.perf_counter()
+        n, total = resumen(args.archivo, args.tipo)
+        segundos = time.perf_counter() - inicio
+        print("Registros:", n, "| Total $", round(total, 2), "| Leído en", round(segundos, 3), "s")
+    elif args.comando == "rotar":
+        diario = Diario(args.archivo, args.tipo)
+        print("Rotado a", diario.rotar())
+        diario.close()
+    elif args.comando == "compactar":
+        print("Compactados", compactar(args.archivo, args.tipo), "registros en", args.archivo)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
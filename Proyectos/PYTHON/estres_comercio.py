@@ -0,0 +1,94 @@
+import argparse
+import multiprocessing
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+from comercio_db import ComercioDB
+
+
+def caja(numero, db_name, pedidos, lote, arranque):
+    """Una terminal: abre su turno y graba sus pedidos, de a uno o en lotes."""
+    db = ComercioDB(db_name)
+    turno = db.abrirTurno("Caja " + str(numero), time.time())
+    arranque.wait()
+    pendientes = []
+    for n in range(pedidos):
+        # cada pedido lleva un cliente único, para detectar pérdidas o duplicados
+        venta = ("p" + str(numero) + "-" + str(n), time.time(), 1, 0, 0, 1, 7.0)
+        if lote > 1:
+            pendientes.append(venta)
+            if len(pendientes) == lote:
+                db.guardarVentas(pendientes, turno)
+                pendientes = []
+        else:
+            db.guardarVenta(venta, turno)
+    if pendientes:
+        db.guardarVentas(pendientes, turno)
+    db.cerrarTurno(turno, time.time())
+    db.close()
+
+
+def verificar(db_name, procesos, pedidos):
+    """Devuelve una lista de problemas encontrados (vacía si todo está bien)."""
+    conn = sqlite3.connect(db_name)
+    problemas = []
+    esperadas = procesos * pedidos
+    total, distintas = conn.execute("SELECT COUNT(*), COUNT(DISTINCT cliente) FROM ventas").fetchone()
+    if total != esperadas:
+        problemas.append("se esperaban " + str(esperadas) + " ventas y hay " + str(total))
+    if distintas != total:
+        problemas.append(str(total - distintas) + " ventas duplicadas")
+    for encargado, caja_turno, pedidos_turno, suma in conn.execute("""SELECT t.encargado, t.caja, t.pedidos,
+            (SELECT COALESCE(SUM(total), 0) FROM ventas v WHERE v.turno = t.id) FROM turnos t"""):
+        if pedidos_turno != pedidos or abs(caja_turno - suma) > 1e-6:
+            problemas.append(encargado + ": el resumen del turno no coincide con sus ventas")
+    abiertos = conn.execute("SELECT COUNT(*) FROM turnos WHERE egreso IS NULL").fetchone()[0]
+    if abiertos:
+        problemas.append(str(abiertos) + " turnos quedaron abiertos")
+    conn.close()
+    return problemas
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Prueba de estrés: varias cajas escribiendo en el mismo comercio.sqlite")
+    parser.add_argument("-p", "--procesos", type=int, default=8)
+    parser.add_argument("-n", "--pedidos", type=int, default=1000, help="pedidos por proceso")
+    parser.add_argument("--lote", type=int, default=1, help="pedidos por transacción (1 = un commit por pedido)")
+    parser.add_argument("--db", help="archivo a usar (por defecto, uno temporal)")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as directorio:
+        db_name = args.db or os.path.join(directorio, "comercio.sqlite")
+        ComercioDB(db_name).close()  # el esquema se crea antes de largar las cajas
+        arranque = multiprocessing.Event()
+        cajas = [multiprocessing.Process(target=caja, args=(n, db_name, args.pedidos, args.lote, arranque))
+                 for n in range(args.procesos)]
+        for proceso in cajas:
+            proceso.start()
+        inicio = time.perf_counter()
+        arranque.set()
+        for proceso in cajas:
+            proceso.join()
+        segundos = time.perf_counter() - inicio
+
+        fallidos = [proceso.exitcode for proceso in cajas if proceso.exitcode != 0]
+        problemas = verificar(db_name, args.procesos, args.pedidos)
+        if fallidos:
+            problemas.append(str(len(fallidos)) + " procesos terminaron con error")
+
+    total = args.procesos * args.pedidos
+    print(args.procesos, "cajas x", args.pedidos, "pedidos =", total, "ventas en", round(segundos, 2), "s |",
+          int(total / segundos), "ventas/s en conjunto")
+    if problemas:
+        for problema in problemas:
+            print("ERROR:", problema)
+        return 1
+    print("Sin ventas perdidas ni duplicadas.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,10 @@
+PRODUCTOS = ("ComboSimple", "ComboDoble", "ComboTriple", "Flurby")
+PRECIOS = {"ComboSimple": 5, "ComboDoble": 6, "ComboTriple": 7, "Flurby": 2}
+
+
+def calcular(precios, pedido):
+    """Costo de un pedido: suma de cantidad por precio de cada producto de la lista de precios."""
+    total = 0
+    for producto, precio in precios.items():
+        total += pedido.get(producto, 0) * precio
+    return total
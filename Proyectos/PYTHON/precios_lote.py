@@ -0,0 +1,176 @@
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+from archivo import Historial
+from diario import CABECERA, LectorDiario
+from precios import PRECIOS, PRODUCTOS
+
+# Mismo formato que diario.VENTA, para leer el diario binario sin copiarlo
+VENTA_DTYPE = np.dtype([("fecha", "<f8"), ("cliente", "S32"), ("cantidades", "<i4", (len(PRODUCTOS),)), ("total", "<f8")])
+
+
+def vector_precios(precios, productos=PRODUCTOS):
+    """Lista de precios como vector, en el orden de productos."""
+    return np.array([precios[producto] for producto in productos], dtype=np.float64)
+
+
+def matriz_escenarios(escenarios, productos=PRODUCTOS, base=PRECIOS):
+    """
+    Arma la matriz productos x escenarios: cada columna es una lista de
+    precios. Cada escenario trae solo los precios que cambia; el resto sale de base.
+    """
+    return np.column_stack([vector_precios({**base, **precios}, productos) for precios in escenarios.values()])
+
+
+def productos_sqlite(historial):
+    """SKU, nombre y precio de catálogo de todos los productos, también los que ya no están a la venta."""
+    return historial.db.cursor.execute("SELECT sku, nombre, precio FROM productos ORDER BY sku").fetchall()
+
+
+def cantidades_sqlite(historial, skus, desde=None, hasta=None, lote=500000):
+    """
+    Recorre las cantidades de venta_items como matrices de a 'lote' ventas
+    (una columna por SKU de skus), en la base activa y en los meses
+    archivados que caen en el rango (ver archivo.Historial).
+    """
+    columnas = np.full(max(skus) + 1, -1)
+    columnas[list(skus)] = np.arange(len(skus))
+    sql = "SELECT id FROM ventas"
+    parametros = ()
+    if desde is not None or hasta is not None:
+        sql += " WHERE fecha >= ? AND fecha < ?"
+        parametros = (desde if desde is not None else float("-inf"), hasta if hasta is not None else float("inf"))
+    for conn in historial.conexiones(desde, hasta):
+        cursor = conn.execute(sql + " ORDER BY id", parametros)
+        while True:
+            ventas = np.array([fila[0] for fila in cursor.fetchmany(lote)], dtype=np.int64)
+            if not len(ventas):
+                break
+            items = np.array(conn.execute("SELECT venta, sku, cantidad FROM venta_items WHERE venta BETWEEN ? AND ?",
+                                          (int(ventas[0]), int(ventas[-1]))).fetchall(), dtype=np.int64).reshape(-1, 3)
+            # entre esos ids puede haber ventas fuera del rango de fechas: sus líneas no se cuentan
+            filas = np.searchsorted(ventas, items[:, 0])
+            presentes = ventas[np.minimum(filas, len(ventas) - 1)] == items[:, 0]
+            items, filas = items[presentes], filas[presentes]
+            if len(items) and (items[:, 1].max() >= len(columnas) or (columnas[items[:, 1]] < 0).any()):
+                raise ValueError("venta_items tiene un SKU que no está en la tabla productos")
+            celdas = filas * len(skus) + columnas[items[:, 1]]
+            yield np.bincount(celdas, weights=items[:, 2], minlength=len(ventas) * len(skus)).reshape(-1, len(skus))
+
+
+def cantidades_diario(archivo, desde=None, hasta=None, lote=500000):
+    """Recorre las cantidades del diario binario (ventas.dat) sin copiar el archivo."""
+    with LectorDiario(archivo, "ventas") as lector:
+        if not lector.cantidad:
+            return
+        ventas = np.frombuffer(lector.mapa, dtype=VENTA_DTYPE, count=lector.cantidad, offset=CABECERA.size)
+        try:
+            for inicio in range(0, len(ventas), lote):
+                bloque = ventas[inicio:inicio + lote]
+                if desde is not None or hasta is not None:
+                    filtro = np.ones(len(bloque), dtype=bool)
+                    if desde is not None:
+                        filtro &= bloque["fecha"] >= desde
+                    if hasta is not None:
+                        filtro &= bloque["fecha"] < hasta
+                    bloque = bloque[filtro]
+                # astype copia: lo que sale del generador no apunta al mmap
+                cantidades = bloque["cantidades"].astype(np.float64)
+                del bloque
+                yield cantidades
+        finally:
+            # el mmap no se puede cerrar mientras haya un arreglo sobre él, aunque se corte el recorrido
+            del ventas
+
+
+def facturar(bloques, escenarios, productos=PRODUCTOS, base=PRECIOS):
+    """
+    Factura todas las ventas con cada escenario de precios. Cada bloque de
+    pedidos (pedidos x productos) se multiplica una sola vez por la matriz de
+    precios (productos x escenarios). Devuelve (cantidad de pedidos, totales).
+    """
+    precios = matriz_escenarios(escenarios, productos, base)
+    totales = np.zeros(precios.shape[1])
+    pedidos = 0
+    for cantidades in bloques:
+        totales += (cantidades @ precios).sum(axis=0)
+        pedidos += len(cantidades)
+    return pedidos, dict(zip(escenarios, totales))
+
+
+def leer_escenarios(archivo):
+    """Lee un JSON {"nombre": {"ComboSimple": 5, ...}}; los productos que falten usan el precio actual."""
+    with open(archivo, encoding="utf-8") as f:
+        datos = json.load(f)
+    return {nombre: dict(precios) for nombre, precios in datos.items()}
+
+
+def leer_escenario(texto):
+    """Convierte 'nombre=ComboSimple:6,Flurby:3' en (nombre, precios que cambian)."""
+    nombre, _, cambios = texto.partition("=")
+    precios = {}
+    for cambio in filter(None, cambios.split(",")):
+        producto, _, precio = cambio.partition(":")
+        try:
+            precios[producto] = float(precio)
+        except ValueError:
+            raise argparse.ArgumentTypeError("precio inválido para " + producto + ": " + precio) from None
+    return nombre, precios
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Factura el historial de ventas con otras listas de precios")
+    origen = parser.add_mutually_exclusive_group()
+    origen.add_argument("--db", default="comercio.sqlite", help="base SQLite de Integrador 2/3")
+    origen.add_argument("--diario", help="diario binario de Integrador 1 (ventas.dat)")
+    parser.add_argument("--escenarios", help="archivo JSON con escenarios de precios")
+    parser.add_argument("-e", "--escenario", type=leer_escenario, action="append", default=[],
+                        help="escenario en línea: nombre=ComboSimple:6,Flurby:3")
+    parser.add_argument("--desde", type=float, help="fecha epoch inicial")
+    parser.add_argument("--hasta", type=float, help="fecha epoch final")
+    args = parser.parse_args(argv)
+
+    escenarios = {"actual": {}}
+    if args.escenarios:
+        escenarios.update(leer_escenarios(args.escenarios))
+    escenarios.update(args.escenario)
+
+    inicio = time.perf_counter()
+    historial = None
+    if args.diario:
+        # el diario solo tiene las columnas del menú original
+        productos, base = PRODUCTOS, PRECIOS
+        bloques = cantidades_diario(args.diario, args.desde, args.hasta)
+    else:
+        # todos los SKU del catálogo, a su precio actual, incluidos los meses archivados
+        historial = Historial(args.db)
+        catalogo = productos_sqlite(historial)
+        productos = [nombre for sku, nombre, precio in catalogo]
+        base = {nombre: precio for sku, nombre, precio in catalogo}
+        bloques = cantidades_sqlite(historial, [sku for sku, nombre, precio in catalogo], args.desde, args.hasta)
+    for nombre, precios in escenarios.items():
+        desconocidos = set(precios) - set(productos)
+        if desconocidos:
+            parser.error("escenario " + nombre + ": producto desconocido: " + ", ".join(sorted(desconocidos)))
+    try:
+        pedidos, totales = facturar(bloques, escenarios, productos, base)
+    finally:
+        if historial is not None:
+            historial.close()
+    segundos = time.perf_counter() - inicio
+
+    base = totales["actual"]
+    print("Pedidos:", pedidos, "| Calculado en", round(segundos, 3), "s")
+    for nombre, total in totales.items():
+        diferencia = total - base
+        porcentaje = (diferencia / base * 100) if base else 0.0
+        print(nombre, "| $", round(total, 2), "| diferencia $", round(diferencia, 2), "(" + str(round(porcentaje, 2)) + " %)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+import argparse
+import sys
+import time
+
+from comercio_db import ComercioDB
+
+
+def ventas_entre(conn, desde, hasta):
+    """Ventas con desde <= fecha < hasta, ordenadas por fecha (recorre solo el rango del índice)."""
+    return conn.execute("""SELECT id, cliente, fecha, ComboS, ComboD, ComboT, Flurby, total
+        FROM ventas WHERE fecha >= ? AND fecha < ? ORDER BY fecha""", (desde, hasta)).fetchall()
+
+
+def facturacion_por_hora(conn, desde, hasta):
+    """Cantidad de pedidos y total facturado por hora (hora local) dentro del rango."""
+    return conn.execute("""SELECT strftime('%Y-%m-%d %H:00', fecha, 'unixepoch', 'localtime') AS hora,
+        COUNT(*), SUM(total)
+        FROM ventas WHERE fecha >= ? AND fecha < ?
+        GROUP BY hora ORDER BY hora""", (desde, hasta)).fetchall()
+
+
+def mejores_clientes(conn, cantidad=10, desde=None, hasta=None):
+    """Los clientes que más facturaron. Sin rango se resuelve solo con el índice (cliente, total)."""
+    if desde is None and hasta is None:
+        return conn.execute("""SELECT cliente, COUNT(*), SUM(total) AS facturado
+            FROM ventas GROUP BY cliente ORDER BY facturado DESC LIMIT ?""", (cantidad,)).fetchall()
+    return conn.execute("""SELECT cliente, COUNT(*), SUM(total) AS facturado
+        FROM ventas WHERE fecha >= ? AND fecha < ?
+        GROUP BY cliente ORDER BY facturado DESC LIMIT ?""",
+        (desde if desde is not None else float("-inf"), hasta if hasta is not None else float("inf"), cantidad)).fetchall()
+
+
+def ventas_por_producto(conn, desde=None, hasta=None):
+    """Unidades y facturación por producto. Con rango, entra por el índice de fecha y toma las líneas por (venta, sku)."""
+    if desde is None and hasta is None:
+        return conn.execute("""SELECT i.sku, p.nombre, SUM(i.cantidad), SUM(i.cantidad * i.precio) AS facturado
+            FROM venta_items i JOIN productos p ON p.sku = i.sku
+            GROUP BY i.sku ORDER BY facturado DESC""").fetchall()
+    return conn.execute("""SELECT i.sku, p.nombre, SUM(i.cantidad), SUM(i.cantidad * i.precio) AS facturado
+        FROM ventas v JOIN venta_items i ON i.venta = v.id JOIN productos p ON p.sku = i.sku
+        WHERE v.fecha >= ? AND v.fecha < ?
+        GROUP BY i.sku ORDER BY facturado DESC""",
+        (desde if desde is not None else float("-inf"), hasta if hasta is not None else float("inf"))).fetchall()
+
+
+def leer_fecha(texto):
+    """Convierte 'AAAA-MM-DD' o 'AAAA-MM-DD HH:MM' (hora local) a epoch."""
+    for formato in ("%Y-%m-%d %H:%M", "%Y-%m-%d"):
+        try:
+            return time.mktime(time.strptime(texto, formato))
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError("fecha inválida: " + texto + " (use AAAA-MM-DD [HH:MM])")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reportes de ventas de Hamburguesas IT")
+    parser.add_argument("--db", default="comercio.sqlite")
+    sub = parser.add_subparsers(dest="comando", required=True)
+    p = sub.add_parser("entre", help="ventas entre dos fechas")
+    p.add_argument("desde", type=leer_fecha)
+    p.add_argument("hasta", type=leer_fecha)
+    p = sub.add_parser("por-hora", help="facturación por hora entre dos fechas")
+    p.add_argument("desde", type=leer_fecha)
+    p.add_argument("hasta", type=leer_fecha)
+    p = sub.add_parser("clientes", help="mejores clientes")
+    p.add_argument("-n", "--cantidad", type=int, default=10)
+    p.add_argument("--desde", type=leer_fecha)
+    p.add_argument("--hasta", type=leer_fecha)
+    p = sub.add_parser("productos", help="unidades y facturación por producto")
+    p.add_argument("--desde", type=leer_fecha)
+    p.add_argument("--hasta", type=leer_fecha)
+    sub.add_parser("migrar", help="lleva la base a la última versión del esquema")
+    args = parser.parse_args(argv)
+
+    # abrir la base ya aplica la migración pendiente, una sola vez por archivo
+    db = ComercioDB(args.db)
+    if args.comando == "entre":
+        for venta in ventas_entre(db.conn, args.desde, args.hasta):
+            print(venta[0], venta[1], time.ctime(venta[2]), *venta[3:])
+    elif args.comando == "por-hora":
+        for hora, pedidos, total in facturacion_por_hora(db.conn, args.desde, args.hasta):
+            print(hora, "|", pedidos, "pedidos | $", round(total, 2))
+    elif args.comando == "clientes":
+        for cliente, pedidos, total in mejores_clientes(db.conn, args.cantidad, args.desde, args.hasta):
+            print(cliente, "|", pedidos, "pedidos | $", round(total, 2))
+    elif args.comando == "productos":
+        for sku, nombre, unidades, total in ventas_por_producto(db.conn, args.desde, args.hasta):
+            print(sku, nombre, "|", unidades, "unidades | $", round(total, 2))
+    elif args.comando == "migrar":
+        version = db.conn.execute("PRAGMA user_version").fetchone()[0]
+        ventas = db.conn.execute("SELECT COUNT(*) FROM ventas").fetchone()[0]
+        print(args.db, "en versión", version, "con", ventas, "ventas")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+import argparse
+import cProfile
+import os
+import pstats
+import random
+import sys
+import tempfile
+import time
+from contextlib import contextmanager, redirect_stdout
+
+from precios import PRODUCTOS
+
+CLIENTES = ("Ana", "Beto", "Carla", "Dario", "Elena", "Facundo", "Gabriela", "Hugo")
+
+
+class Guion:
+    """Reemplazo de input(): devuelve las respuestas de un guion, una por llamada."""
+
+    def __init__(self, lineas):
+        self.lineas = iter(lineas)
+        self.leidas = 0
+
+    def __call__(self, mensaje=""):
+        try:
+            linea = next(self.lineas)
+        except StopIteration:
+            raise EOFError("el guion terminó antes de apagar el sistema (opción 3)") from None
+        self.leidas += 1
+        return linea.rstrip("\r\n")
+
+
+def leer_guion(archivo):
+    """Respuestas de un archivo de texto, una por línea, tal como se tipean en el menú."""
+    with open(archivo, encoding="utf-8") as f:
+        yield from f
+
+
+def guion_sintetico(pedidos, por_turno=250, semilla=1):
+    """
+    Genera las respuestas que tipearía un encargado: nombre, opción 1 con el
+    pedido completo (cliente, cantidades, pago y confirmación), opción 2 cada
+    'por_turno' pedidos y opción 3 al final.
+    """
+    azar = random.Random(semilla)
+    for n in range(pedidos):
+        if n % por_turno == 0:
+            if n:
+                yield "2"
+            yield CLIENTES[n // por_turno % len(CLIENTES)]
+        yield "1"
+        yield azar.choice(CLIENTES)
+        for _ in PRODUCTOS:
+            yield str(azar.randint(0, 3))
+        yield "1000"
+        yield "y"
+    if not pedidos:
+        yield CLIENTES[0]
+    yield "3"
+
+
+@contextmanager
+def silencio():
+    """Descarta todo lo que imprime el menú (saludos, prompts, totales)."""
+    with open(os.devnull, "w") as nulo, redirect_stdout(nulo):
+        yield
+
+
+def argumentos(descripcion, argv=None):
+    parser = argparse.ArgumentParser(description=descripcion)
+    fuente = parser.add_mutually_exclusive_group()
+    fuente.add_argument("--guion", help="reproduce las respuestas de este archivo (una por línea)")
+    fuente.add_argument("--sinteticos", type=int, metavar="PEDIDOS", help="reproduce PEDIDOS pedidos generados")
+    parser.add_argument("--por-turno", type=int, default=250, help="pedidos entre cambios de turno (con --sinteticos)")
+    parser.add_argument("--directorio", help="dónde quedan los archivos de la reproducción (por defecto, uno temporal)")
+    parser.add_argument("--perfil", action="store_true", help="corre con cProfile y muestra las funciones más costosas")
+    return parser.parse_args(argv)
+
+
+def reproducir(main, args):
+    """
+    Corre main(guion) sin pantalla ni prompts y muestra el rendimiento.
+    main recibe la fuente de respuestas y devuelve la cantidad de pedidos guardados.
+    """
+    if args.guion:
+        guion = Guion(leer_guion(os.path.abspath(args.guion)))
+    else:
+        guion = Guion(guion_sintetico(args.sinteticos, args.por_turno))
+    perfil = cProfile.Profile() if args.perfil else None
+    original = os.getcwd()
+    with tempfile.TemporaryDirectory() as temporal:
+        # los archivos del comercio se crean en el directorio actual: nunca se mezclan con los reales
+        os.chdir(args.directorio or temporal)
+        try:
+            inicio = time.perf_counter()
+            with silencio():
+                if perfil:
+                    pedidos = perfil.runcall(main, guion)
+                else:
+                    pedidos = main(guion)
+            segundos = time.perf_counter() - inicio
+        finally:
+            os.chdir(original)
+    print(pedidos, "pedidos,", guion.leidas, "respuestas en", round(segundos, 3), "s |",
+          int(pedidos / segundos) if segundos else 0, "pedidos/s")
+    if perfil:
+        pstats.Stats(perfil).sort_stats("cumulative").print_stats(15)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera un guion de pedidos para reproducir en Integrador 1/2")
+    parser.add_argument("archivo")
+    parser.add_argument("-n", "--pedidos", type=int, default=10000)
+    parser.add_argument("--por-turno", type=int, default=250)
+    args = parser.parse_args(argv)
+
+    with open(args.archivo, "w", encoding="utf-8") as f:
+        for linea in guion_sintetico(args.pedidos, args.por_turno):
+            f.write(linea + "\n")
+    print("Guion con", args.pedidos, "pedidos en", args.archivo)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+import argparse
+import asyncio
+import json
+import signal
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from comercio_db import ComercioDB, EscritorVentas
+
+ESTADOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+# un pedido son unos cientos de bytes; más que esto no se lee a memoria
+MAX_CUERPO = 64 * 1024
+
+
+class PedidoInvalido(ValueError):
+    pass
+
+
+def entero(valor):
+    return isinstance(valor, int) and not isinstance(valor, bool)
+
+
+def leer_pedido(datos, catalogo):
+    """
+    Valida un pedido JSON y devuelve (encargado, cliente, líneas). Los productos
+    van en "items" como [sku, cantidad] o {"sku": .., "cantidad": ..}, o como en
+    los menús: el nombre del producto con su cantidad ("ComboSimple": 2).
+    """
+    if not isinstance(datos, dict):
+        raise PedidoInvalido("el pedido debe ser un objeto JSON")
+    cliente = datos.get("cliente")
+    encargado = datos.get("encargado")
+    if not isinstance(cliente, str) or not cliente.strip():
+        raise PedidoInvalido("falta el cliente")
+    if not isinstance(encargado, str) or not encargado.strip():
+        raise PedidoInvalido("falta el encargado")
+    if "items" in datos:
+        if not isinstance(datos["items"], list):
+            raise PedidoInvalido("items debe ser una lista")
+        items = []
+        for item in datos["items"]:
+            if isinstance(item, dict):
+                item = (item.get("sku"), item.get("cantidad", 1))
+            if not isinstance(item, (list, tuple)) or len(item) != 2:
+                raise PedidoInvalido("cada item es [sku, cantidad]")
+            items.append(tuple(item))
+    else:
+        items = [(catalogo.skus[nombre], cantidad) for nombre, cantidad in datos.items() if nombre in catalogo.skus]
+    for sku, cantidad in items:
+        if not entero(sku) or not entero(cantidad) or cantidad < 0:
+            raise PedidoInvalido("item inválido: " + json.dumps([sku, cantidad]))
+    try:
+        lineas = catalogo.lineas(items)
+    except KeyError as e:
+        raise PedidoInvalido(e.args[0]) from None
+    return encargado.strip(), cliente.strip(), lineas
+
+
+class ServicioPedidos:
+    """
+    Servicio local de pedidos para kioscos y terminales sin ventana.
+    Recibe pedidos como JSON por HTTP, los factura con el catálogo de
+    productos de la base (precio por SKU en memoria) y los manda a una
+    única cola de escritura (EscritorVentas), así todas las terminales
+    comparten una sola conexión que escribe en comercio.sqlite.
+    """
+
+    def __init__(self, db_name="comercio.sqlite"):
+        # un solo hilo es el dueño de la conexión para turnos y consultas
+        self.trabajos = ThreadPoolExecutor(max_workers=1, thread_name_prefix="turnos")
+        self.db = self.trabajos.submit(ComercioDB, db_name).result()
+        self.catalogo = self.trabajos.submit(self.db.catalogo).result()
+        self.escritor = EscritorVentas(db_name)
+        self.turnos = {}
+        self.pedidos = 0
+
+    async def _en_db(self, funcion, *args):
+        return await asyncio.get_running_loop().run_in_executor(self.trabajos, funcion, *args)
+
+    async def turno_de(self, encargado):
+        """Id del turno abierto del encargado; se abre la primera vez que aparece."""
+        turno = self.turnos.get(encargado)
+        if turno is None:
+            turno = await self._en_db(self.db.abrirTurno, encargado, time.time())
+            self.turnos[encargado] = turno
+        return turno
+
+    async def registrar(self, datos):
+        encargado, cliente, lineas = leer_pedido(datos, self.catalogo)
+        turno = await self.turno_de(encargado)
+        self.escritor.encolarPedido(cliente, time.time(), lineas, turno)
+        self.pedidos += 1
+        return {"total": sum(cantidad * precio for sku, cantidad, precio in lineas), "turno": turno}
+
+    def productos(self):
+        """El menú a la venta, para que los kioscos armen sus botones."""
+        return [{"sku": sku, "nombre": nombre, "precio": self.catalogo.precios[sku]}
+                for nombre, sku in sorted(self.catalogo.skus.items(), key=lambda par: par[1])]
+
+    async def cerrar_turno(self, datos):
+        encargado = datos.get("encargado") if isinstance(datos, dict) else None
+        turno = self.turnos.pop(encargado, None)
+        if turno is None:
+            raise PedidoInvalido("ese encargado no tiene un turno abierto en este servicio")
+
+        def cerrar():
+            # primero se graban sus ventas pendientes, así la caja queda completa
+            self.escritor.vaciar()
+            return self.db.cerrarTurno(turno, time.time())
+        try:
+            caja = await self._en_db(cerrar)
+        except BaseException:
+            # en la base el turno sigue abierto: el servicio tampoco lo olvida, así se puede reintentar
+            self.turnos.setdefault(encargado, turno)
+            raise
+        return {"turno": turno, "caja": caja}
+
+    async def despachar(self, metodo, ruta, cuerpo):
+        """Devuelve (estado HTTP, respuesta JSON) para un pedido HTTP."""
+        rutas = {"/pedidos": ("POST", self.registrar), "/turnos/cerrar": ("POST", self.cerrar_turno)}
+        if ruta in ("/estado", "/productos"):
+            if metodo != "GET":
+                return 405, {"error": "use GET"}
+            if ruta == "/productos":
+                return 200, self.productos()
+            return 200, dict(self.escritor.estadisticas(), pedidos=self.pedidos, turnos=len(self.turnos))
+        if ruta not in rutas:
+            return 404, {"error": "ruta desconocida"}
+        metodo_ruta, funcion = rutas[ruta]
+        if metodo != metodo_ruta:
+            return 405, {"error": "use " + metodo_ruta}
+        try:
+            return 200, await funcion(json.loads(cuerpo or b"{}"))
+        except (ValueError, PedidoInvalido) as e:
+            return 400, {"error": str(e)}
+
+    async def atender(self, reader, writer):
+        """Atiende una conexión HTTP/1.1 con keep-alive: varios pedidos por conexión."""
+        try:
+            while True:
+                linea = await reader.readline()
+                if not linea:
+                    break
+                try:
+                    metodo, ruta, _ = linea.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    break
+                largo = 0
+                cerrar = False
+                error = None
+                while True:
+                    cabecera = await reader.readline()
+                    if cabecera in (b"\r\n", b"\n", b""):
+                        break
+                    nombre, _, valor = cabecera.decode("latin-1").partition(":")
+                    nombre = nombre.strip().lower()
+                    if nombre == "content-length":
+                        try:
+                            largo = int(valor.strip())
+                        except ValueError:
+                            largo = -1
+                        if largo < 0:
+                            error = 400, {"error": "Content-Length inválido"}
+                        elif largo > MAX_CUERPO:
+                            error = 413, {"error": "el pedido supera " + str(MAX_CUERPO) + " bytes"}
+                    elif nombre == "connection" and valor.strip().lower() == "close":
+                        cerrar = True
+                if error is not None:
+                    # sin un largo válido no se sabe dónde termina el cuerpo: se contesta y se corta
+                    estado, respuesta = error
+                    cerrar = True
+                else:
+                    cuerpo = await reader.readexactly(largo) if largo else b""
+                    try:
+                        estado, respuesta = await self.despachar(metodo, ruta, cuerpo)
+                    except Exception as e:
+                        estado, respuesta = 500, {"error": str(e)}
+                datos = json.dumps(respuesta).encode("utf-8")
+                writer.write(("HTTP/1.1 " + str(estado) + " " + ESTADOS[estado] + "\r\n"
+                              "Content-Type: application/json\r\n"
+                              "Content-Length: " + str(len(datos)) + "\r\n"
+                              + ("Connection: close\r\n" if cerrar else "") + "\r\n").encode("latin-1") + datos)
+                await writer.drain()
+                if cerrar:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    def cerrar(self):
+        """Cierra los turnos abiertos por el servicio y graba todo lo pendiente."""
+        def cerrar_todo():
+            self.escritor.vaciar()
+            for turno in self.turnos.values():
+                self.db.cerrarTurno(turno, time.time())
+            self.escritor.cerrar()
+            self.db.close()
+        self.trabajos.submit(cerrar_todo).result()
+        self.trabajos.shutdown()
+
+
+async def servir(host, puerto, db_name):
+    servicio = ServicioPedidos(db_name)
+    servidor = await asyncio.start_server(servicio.atender, host, puerto)
+    parada = asyncio.Event()
+    try:
+        # detenido como servicio (kill / systemctl stop) también cierra los turnos
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, parada.set)
+    except (NotImplementedError, AttributeError):
+        pass  # Windows: solo Ctrl+C
+    print("Atendiendo pedidos en http://" + host + ":" + str(puerto) + " (Ctrl+C para terminar)")
+    try:
+        async with servidor:
+            await parada.wait()
+    finally:
+        servicio.cerrar()
+
+
+async def generar_carga(host, puerto, pedidos, conexiones):
+    """Generador de carga: 'conexiones' clientes mandan 'pedidos' pedidos en total."""
+    async def cliente(numero, cantidad):
+        reader, writer = await asyncio.open_connection(host, puerto)
+        for n in range(cantidad):
+            datos = json.dumps({"cliente": "Kiosco " + str(numero), "encargado": "Kiosco " + str(numero),
+                                "ComboSimple": 1 + n % 3, "Flurby": n % 2}).encode("utf-8")
+            writer.write(b"POST /pedidos HTTP/1.1\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: " + str(len(datos)).encode() + b"\r\n\r\n" + datos)
+            await writer.drain()
+            await reader.readline()
+            largo = 0
+            while True:
+                cabecera = await reader.readline()
+                if cabecera in (b"\r\n", b""):
+                    break
+                if cabecera.lower().startswith(b"content-length:"):
+                    largo = int(cabecera.split(b":")[1])
+            await reader.readexactly(largo)
+        writer.close()
+
+    inicio = time.perf_counter()
+    porcion, resto = divmod(pedidos, conexiones)
+    await asyncio.gather(*(cliente(n, porcion + (1 if n < resto else 0)) for n in range(conexiones)))
+    segundos = time.perf_counter() - inicio
+    print(pedidos, "pedidos en", round(segundos, 2), "s |", int(pedidos / segundos), "pedidos/s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Servicio de pedidos de Hamburguesas IT por HTTP/JSON")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--puerto", type=int, default=8080)
+    parser.add_argument("--db", default="comercio.sqlite")
+    parser.add_argument("--carga", type=int, metavar="PEDIDOS", help="en vez de atender, manda PEDIDOS pedidos a un servicio")
+    parser.add_argument("--conexiones", type=int, default=8, help="clientes simultáneos del generador de carga")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.carga:
+            asyncio.run(generar_carga(args.host, args.puerto, args.carga, args.conexiones))
+        else:
+            asyncio.run(servir(args.host, args.puerto, args.db))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+# Registro de cambios de tareas.db, compartido por Tk Tareas 1 y Tk Tareas 2: los
+# triggers anotan en tareas_cambios el id de cada tarea que se agrega, cambia o
+# borra, con una versión que solo crece (AUTOINCREMENT no reutiliza números).
+# Cada ventana recuerda la última versión que aplicó y lee solo las posteriores.
+
+# Cambios que se conservan al abrir una ventana; una ventana más atrasada relee todo
+CAMBIOS_GUARDADOS = 10000
+
+TRIGGERS = {
+    'tareas_cambios_insert': '''
+        CREATE TRIGGER IF NOT EXISTS tareas_cambios_insert AFTER INSERT ON tareas BEGIN
+            INSERT INTO tareas_cambios (tarea) VALUES (new.id);
+        END
+    ''',
+    'tareas_cambios_update': '''
+        CREATE TRIGGER IF NOT EXISTS tareas_cambios_update AFTER UPDATE ON tareas BEGIN
+            INSERT INTO tareas_cambios (tarea) VALUES (new.id);
+        END
+    ''',
+    'tareas_cambios_delete': '''
+        CREATE TRIGGER IF NOT EXISTS tareas_cambios_delete AFTER DELETE ON tareas BEGIN
+            INSERT INTO tareas_cambios (tarea) VALUES (old.id);
+        END
+    ''',
+}
+
+
+def crear_registro(conn):
+    """Crea tareas_cambios y sus triggers si faltan, y descarta los cambios más viejos. No hace commit."""
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS tareas_cambios (
+            version INTEGER PRIMARY KEY AUTOINCREMENT,
+            tarea INTEGER NOT NULL
+        )
+    ''')
+    for trigger in TRIGGERS.values():
+        conn.execute(trigger)
+    conn.execute("DELETE FROM tareas_cambios WHERE version <= ?", (version_actual(conn) - CAMBIOS_GUARDADOS,))
+
+
+def version_actual(conn):
+    """Versión del último cambio registrado (0 si todavía no hubo ninguno)."""
+    fila = conn.execute("SELECT seq FROM sqlite_sequence WHERE name='tareas_cambios'").fetchone()
+    return fila[0] if fila else 0
+
+
+class Seguidor:
+    """
+    Sigue los cambios de tareas hechos desde otras conexiones. PRAGMA
+    data_version solo cambia cuando escribe otra conexión, así que revisar
+    cuesta una consulta sin tocar ninguna tabla mientras nadie escribe.
+    """
+
+    def __init__(self, conn):
+        self.conn = conn
+        self.data_version = self._data_version()
+        self.version = version_actual(conn)
+
+    def _data_version(self):
+        return self.conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def cambios(self):
+        """
+        Ids de las tareas agregadas, cambiadas o borradas desde la llamada
+        anterior (vacío si no hubo nada). Puede incluir cambios propios, así
+        que aplicarlos debe ser releer esas tareas. Devuelve None si parte de
+        los cambios ya se descartó del registro: hay que releer todo.
+        """
+        data_version = self._data_version()
+        if data_version == self.data_version:
+            return set()
+        self.data_version = data_version
+        filas = self.conn.execute("SELECT version, tarea FROM tareas_cambios WHERE version > ? ORDER BY version",
+                                  (self.version,)).fetchall()
+        if not filas:
+            return set()
+        # las versiones son consecutivas: si falta la siguiente, se descartó sin aplicarla
+        salteados = filas[0][0] != self.version + 1
+        self.version = filas[-1][0]
+        return None if salteados else {tarea for version, tarea in filas}